@@ -1,22 +1,31 @@
 from flask import Flask
 from flask_cors import CORS
-from dotenv import load_dotenv
+
+from .env import load_env
 
 
 def create_app() -> Flask:
     """Application factory for the Flask app."""
     # Load environment variables from a .env file if present
-    load_dotenv()
+    load_env()
     app = Flask(__name__)
     # Enable CORS for API routes; adjust origins via CORS_ORIGINS env if needed
     CORS(
         app,
         resources={r"/api/*": {"origins": "*"}},
         supports_credentials=True,
-        expose_headers=["Content-Type"],
+        expose_headers=["Content-Type", "ETag", "Last-Modified"],
         max_age=600,
     )
 
+    # Request/DB/upstream metrics and GET /metrics (METRICS_ENABLED=0 disables)
+    from .services import metrics
+    metrics.init_app(app)
+
+    # Opt-in request profiling (PROFILE_TOKEN header or PROFILE_SAMPLE_RATE)
+    from .services import profiling
+    profiling.init_app(app)
+
     # Register all blueprints found under app.routes automatically
     from .routes import register_blueprints
     register_blueprints(app, package="app.routes", url_prefix="/api")
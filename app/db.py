@@ -1,12 +1,19 @@
 import os
 import re
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Dict
+
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
-from dotenv import load_dotenv
+from sqlalchemy.pool import QueuePool
+
+from app.env import load_env
 
 
 # Load environment variables from .env (if present)
-load_dotenv()
+load_env()
 
 # Accept plain postgres/postgresql URLs and rewrite to psycopg v3 driver.
 # Provide a safe local default if DATABASE_URL is not set.
@@ -18,5 +25,133 @@ raw_url = os.getenv(
 # If the URL uses the generic scheme (postgres:// or postgresql://), rewrite to psycopg driver
 DATABASE_URL = re.sub(r"^postgres(ql)?://", "postgresql+psycopg://", raw_url)
 
-engine = create_engine(DATABASE_URL, pool_pre_ping=True, future=True)
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    return os.getenv(name, "1" if default else "0").lower() in {"1", "true", "yes", "on"}
+
+
+# Pool tuning. Defaults match SQLAlchemy's, except recycle which is off (-1) unless set.
+# With DB_POOL_RECYCLE below the server/proxy idle timeout, pre-ping can usually be disabled.
+POOL_SIZE = _env_int("DB_POOL_SIZE", 5)
+POOL_MAX_OVERFLOW = _env_int("DB_MAX_OVERFLOW", 10)
+POOL_TIMEOUT = _env_int("DB_POOL_TIMEOUT", 30)
+POOL_RECYCLE = _env_int("DB_POOL_RECYCLE", -1)
+POOL_PRE_PING = _env_bool("DB_POOL_PRE_PING", True)
+
+
+class PoolStats:
+    """Thread-safe checkout counters and latency histogram for the engine pool."""
+
+    # Upper bounds (ms) of the checkout latency histogram buckets; the last bucket is +Inf
+    BUCKETS_MS = (0.5, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.checkouts = 0
+            self.checkout_errors = 0
+            self.checkout_time_ms = 0.0
+            self.waits = 0
+            self.wait_time_ms = 0.0
+            self.max_checkout_ms = 0.0
+            self.buckets = [0] * (len(self.BUCKETS_MS) + 1)
+
+    def record(self, elapsed_ms: float, waited: bool, ok: bool = True) -> None:
+        with self._lock:
+            if not ok:
+                self.checkout_errors += 1
+                return
+            self.checkouts += 1
+            self.checkout_time_ms += elapsed_ms
+            self.max_checkout_ms = max(self.max_checkout_ms, elapsed_ms)
+            self.buckets[bisect_left(self.BUCKETS_MS, elapsed_ms)] += 1
+            if waited:
+                self.waits += 1
+                self.wait_time_ms += elapsed_ms
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            bounds = [str(b) for b in self.BUCKETS_MS] + ["+Inf"]
+            cumulative, histogram = 0, {}
+            for le, count in zip(bounds, self.buckets):
+                cumulative += count
+                histogram[le] = cumulative
+            return {
+                "checkouts": self.checkouts,
+                "checkout_errors": self.checkout_errors,
+                "checkout_time_ms_total": round(self.checkout_time_ms, 3),
+                "checkout_time_ms_max": round(self.max_checkout_ms, 3),
+                "waits": self.waits,
+                "wait_time_ms_total": round(self.wait_time_ms, 3),
+                "checkout_latency_ms_histogram": histogram,
+            }
+
+
+pool_stats = PoolStats()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout takes.
+
+    The measured time covers waiting for a free slot, opening new connections and
+    pre-ping. A checkout counts as a wait when no idle connection was available.
+    """
+
+    def connect(self):  # type: ignore[override]
+        waited = self.checkedin() == 0
+        start = time.perf_counter()
+        try:
+            conn = super().connect()
+        except Exception:
+            pool_stats.record(0.0, waited, ok=False)
+            raise
+        pool_stats.record((time.perf_counter() - start) * 1000.0, waited)
+        return conn
+
+
+engine = create_engine(
+    DATABASE_URL,
+    poolclass=InstrumentedQueuePool,
+    pool_size=POOL_SIZE,
+    max_overflow=POOL_MAX_OVERFLOW,
+    pool_timeout=POOL_TIMEOUT,
+    pool_recycle=POOL_RECYCLE,
+    pool_pre_ping=POOL_PRE_PING,
+    future=True,
+)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+
+
+def get_pool_status() -> Dict[str, Any]:
+    """Current pool occupancy, configuration and cumulative checkout statistics."""
+    pool = engine.pool
+    status: Dict[str, Any] = {
+        "config": {
+            "pool_size": POOL_SIZE,
+            "max_overflow": POOL_MAX_OVERFLOW,
+            "pool_timeout": POOL_TIMEOUT,
+            "pool_recycle": POOL_RECYCLE,
+            "pre_ping": POOL_PRE_PING,
+        },
+    }
+    if isinstance(pool, QueuePool):
+        status.update(
+            {
+                "size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                "overflow": max(0, pool.overflow()),
+            }
+        )
+    status.update(pool_stats.snapshot())
+    return status
@@ -0,0 +1,20 @@
+"""Single, idempotent .env load shared by the app factory and modules that read env at import."""
+from __future__ import annotations
+
+import threading
+
+_lock = threading.Lock()
+_loaded = False
+
+
+def load_env() -> None:
+    """Load .env into os.environ once per process (existing variables win)."""
+    global _loaded
+    if _loaded:
+        return
+    with _lock:
+        if not _loaded:
+            from dotenv import load_dotenv
+
+            load_dotenv()
+            _loaded = True
@@ -2,11 +2,15 @@ from sqlalchemy import (
     BigInteger,
     Column,
     Date,
+    Float,
+    JSON,
     Numeric,
     String,
     Text,
     TIMESTAMP,
     func,
+    text,
+    Index,
     UniqueConstraint,
 )
 from sqlalchemy.orm import declarative_base
@@ -18,12 +22,12 @@ Base = declarative_base()
 class EodPrice(Base):
     __tablename__ = "eod_prices"
 
-    # Surrogate primary key
+    # Surrogate key; the primary key must include the partition key (trade_date)
     id = Column(BigInteger, primary_key=True, autoincrement=True)
 
     # Natural keys and data
     symbol = Column(String, nullable=False)
-    trade_date = Column(Date, nullable=False)
+    trade_date = Column(Date, primary_key=True, nullable=False)
     open = Column(Numeric(20, 8), nullable=False)
     high = Column(Numeric(20, 8), nullable=False)
     low = Column(Numeric(20, 8), nullable=False)
@@ -36,6 +40,73 @@ class EodPrice(Base):
         TIMESTAMP(timezone=True), server_default=func.now(), nullable=False
     )
 
+    __table_args__ = (
+        # INCLUDE makes OHLCV reads by (symbol, trade_date) index-only scans
+        UniqueConstraint(
+            "symbol",
+            "trade_date",
+            name="uq_eod_prices_symbol_date",
+            postgresql_include=["open", "high", "low", "close", "volume"],
+        ),
+        # Yearly range partitions (eod_prices_yYYYY), created on demand by
+        # repository.ensure_eod_partitions
+        {"postgresql_partition_by": "RANGE (trade_date)"},
+    )
+
+
+class EodRollingStats(Base):
+    """Rolling 7/30/90-bar statistics per (symbol, trade_date), derived from eod_prices.
+
+    Maintained incrementally by app.services.rolling_stats on ingest. Window
+    columns are NULL until the symbol has that many bars.
+    """
+
+    __tablename__ = "eod_rolling_stats"
+
+    symbol = Column(String, primary_key=True)
+    trade_date = Column(Date, primary_key=True)
+    close = Column(Numeric(20, 8), nullable=False)
+
+    # Return over the window: close / first close in window - 1
+    return_7d = Column(Float)
+    return_30d = Column(Float)
+    return_90d = Column(Float)
+    # Sample stddev of daily close-to-close returns in the window
+    volatility_7d = Column(Float)
+    volatility_30d = Column(Float)
+    volatility_90d = Column(Float)
+    avg_volume_7d = Column(Float)
+    avg_volume_30d = Column(Float)
+    avg_volume_90d = Column(Float)
+    high_7d = Column(Numeric(20, 8))
+    high_30d = Column(Numeric(20, 8))
+    high_90d = Column(Numeric(20, 8))
+    low_7d = Column(Numeric(20, 8))
+    low_30d = Column(Numeric(20, 8))
+    low_90d = Column(Numeric(20, 8))
+
+    updated_at = Column(
+        TIMESTAMP(timezone=True), server_default=func.now(), nullable=False
+    )
+
+
+class EodFetchCoverage(Base):
+    """Date ranges already fetched from FMP per symbol (including non-trading days)."""
+
+    __tablename__ = "eod_fetch_coverage"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    symbol = Column(String, nullable=False)
+    from_date = Column(Date, nullable=False)
+    to_date = Column(Date, nullable=False)
+    fetched_at = Column(
+        TIMESTAMP(timezone=True), server_default=func.now(), nullable=False
+    )
+
+    __table_args__ = (
+        Index("ix_eod_fetch_coverage_symbol_to_date", "symbol", "to_date"),
+    )
+
 
 class DailyRecommendation(Base):
     __tablename__ = "daily_recommendations"
@@ -57,4 +128,28 @@ class DailyRecommendation(Base):
         UniqueConstraint(
             "symbol", "trade_date", "model_name", name="uq_daily_rec_symbol_date_model"
         ),
+        # Latest-per-symbol lookups: symbol = ? ORDER BY trade_date DESC, created_at DESC.
+        # They return whole rows, so no INCLUDE columns: the heap is visited anyway.
+        Index(
+            "ix_daily_rec_symbol_latest",
+            "symbol",
+            text("trade_date DESC"),
+            text("created_at DESC"),
+        ),
+    )
+
+
+class LlmResponseCache(Base):
+    __tablename__ = "llm_response_cache"
+
+    # sha256 of (model, prompt version, serialized input)
+    cache_key = Column(String(64), primary_key=True)
+    model_name = Column(String, nullable=False)
+    prompt_version = Column(String, nullable=False)
+    response = Column(JSON, nullable=False)
+    hit_count = Column(BigInteger, nullable=False, server_default="0")
+    created_at = Column(
+        TIMESTAMP(timezone=True), server_default=func.now(), nullable=False
     )
+    last_hit_at = Column(TIMESTAMP(timezone=True))
+    expires_at = Column(TIMESTAMP(timezone=True), nullable=False, index=True)
@@ -1,31 +1,60 @@
 """Routes package utilities: centralized blueprint registration.
 
-Auto-discovers Flask Blueprint instances in modules under app.routes and
-registers them with the provided url_prefix.
+Blueprints of this package are listed explicitly in BLUEPRINTS, so startup
+imports exactly those modules and reads one attribute each. Other packages
+(or this one with ROUTES_AUTODISCOVER=1) fall back to auto-discovery: import every
+module under the package and register any Blueprint instances found.
 """
 
 from __future__ import annotations
 
 import importlib
+import os
 import pkgutil
+from typing import Iterator, Tuple
+
 from flask import Blueprint, Flask
 
-def register_blueprints(
-    app: Flask, package: str = "app.routes", url_prefix: str = "/api"
-) -> None:
-    """Import all modules in the routes package and register any Blueprint instances found.
 
-    - Discovers modules via pkgutil (excluding subpackages by default)
-    - Registers attributes that are instances of flask.Blueprint
-    - Applies a common url_prefix (default: /api)
-    """
+# (module, attribute) of every blueprint in app.routes; add new route modules here
+BLUEPRINTS: Tuple[Tuple[str, str], ...] = (
+    ("app.routes.db_stats", "db_stats_bp"),
+    ("app.routes.export", "export_bp"),
+    ("app.routes.fetch_data", "fmp_bp"),
+    ("app.routes.ping", "ping_bp"),
+    ("app.routes.prices", "prices_bp"),
+    ("app.routes.recommendations", "recs_bp"),
+    ("app.routes.screener", "screener_bp"),
+)
+
+
+def discover_blueprints(package: str) -> Iterator[Blueprint]:
+    """Import all modules in a package (no subpackages or _private modules) and yield their Blueprints."""
     pkg = importlib.import_module(package)
     # pkg.__path__ is a list-like of paths where the package's modules live
     for _finder, mod_name, is_pkg in pkgutil.iter_modules(pkg.__path__):  # type: ignore[attr-defined]
         if is_pkg or mod_name.startswith("_"):
             continue
         module = importlib.import_module(f"{package}.{mod_name}")
-        for attr_name in dir(module):
-            attr = getattr(module, attr_name)
+        for attr in vars(module).values():
             if isinstance(attr, Blueprint):
-                app.register_blueprint(attr, url_prefix=url_prefix)
+                yield attr
+
+
+def register_blueprints(
+    app: Flask, package: str = "app.routes", url_prefix: str = "/api"
+) -> None:
+    """Register the package's Blueprint instances with a common url_prefix (default: /api).
+
+    Uses the explicit BLUEPRINTS registry for this package unless
+    ROUTES_AUTODISCOVER=1; any other package is auto-discovered.
+    """
+    autodiscover = os.getenv("ROUTES_AUTODISCOVER", "0").lower() in {"1", "true", "yes", "on"}
+    if package == __name__ and not autodiscover:
+        blueprints = (
+            getattr(importlib.import_module(module), attr) for module, attr in BLUEPRINTS
+        )
+    else:
+        blueprints = discover_blueprints(package)
+    for bp in blueprints:
+        app.register_blueprint(bp, url_prefix=url_prefix)
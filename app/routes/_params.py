@@ -0,0 +1,52 @@
+"""Query-string parsing and error responses shared by the route modules.
+
+Underscore-prefixed so blueprint auto-discovery skips it.
+"""
+from datetime import date
+from typing import List, Optional, Sequence, Tuple
+
+from flask import jsonify, request
+
+
+def error(code: str, message: str, status: int = 400):
+    return jsonify({"error": code, "message": message}), status
+
+
+def csv_arg(name: str) -> List[str]:
+    """Comma-separated query arg as a list of stripped, non-empty, de-duplicated values."""
+    return list(dict.fromkeys(s.strip() for s in request.args.get(name, "").split(",") if s.strip()))
+
+
+def date_arg(name: str) -> Optional[date]:
+    """ISO YYYY-MM-DD query arg or None; raises ValueError if malformed."""
+    value = request.args.get(name)
+    return date.fromisoformat(value) if value else None
+
+
+def float_arg(name: str) -> Optional[float]:
+    """Numeric query arg or None; raises ValueError if malformed."""
+    value = request.args.get(name)
+    return float(value) if value not in (None, "") else None
+
+
+def columns_arg(allowed: Sequence[str]):
+    """`columns` query arg (default: all of allowed); returns (columns, None) or (None, error response)."""
+    columns = csv_arg("columns") or list(allowed)
+    unknown = [c for c in columns if c not in allowed]
+    if unknown:
+        return None, error(
+            "invalid_columns", f"Unknown columns {unknown}; choose from {list(allowed)}"
+        )
+    return columns, None
+
+
+def date_range_args() -> Tuple[Optional[date], Optional[date], Optional[tuple]]:
+    """`from`/`to` query args; returns (from, to, None) or (None, None, error response)."""
+    try:
+        from_dt = date_arg("from")
+        to_dt = date_arg("to")
+    except ValueError:
+        return None, None, error("invalid_date", "Dates must be ISO YYYY-MM-DD")
+    if from_dt and to_dt and from_dt > to_dt:
+        return None, None, error("invalid_range", "'from' date cannot be after 'to' date")
+    return from_dt, to_dt, None
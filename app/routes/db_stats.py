@@ -0,0 +1,12 @@
+from flask import Blueprint, jsonify
+
+from app.db import get_pool_status
+
+
+db_stats_bp = Blueprint("db_stats", __name__)
+
+
+@db_stats_bp.get("/db/pool")
+def pool_status():
+    """Connection pool occupancy, config and checkout latency histogram."""
+    return jsonify(get_pool_status())
@@ -0,0 +1,147 @@
+import csv
+import io
+import json
+import tempfile
+from datetime import date, datetime
+from typing import Any, Iterable, Iterator, List, Sequence, Tuple
+
+from flask import Blueprint, Response, request, send_file, stream_with_context
+
+from app.routes._params import columns_arg, csv_arg, date_range_args, error
+from app.services import columnar_export
+from app.services.repository import (
+    PRICE_COLUMNS,
+    RECOMMENDATION_FIELDS,
+    iter_price_rows,
+    iter_recommendation_rows,
+)
+
+export_bp = Blueprint("export", __name__)
+
+# Rows serialized per chunk written to the socket
+CHUNK_ROWS = 1000
+
+FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+# Columnar formats (prices only)
+COLUMNAR_FORMATS = {
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def _jsonable(v: Any) -> Any:
+    if isinstance(v, (date, datetime)):
+        return v.isoformat()
+    return v
+
+
+def _ndjson_chunks(fields: Sequence[str], rows: Iterable[Tuple]) -> Iterator[str]:
+    buf: List[str] = []
+    for row in rows:
+        buf.append(json.dumps(dict(zip(fields, map(_jsonable, row))), separators=(",", ":")))
+        if len(buf) >= CHUNK_ROWS:
+            yield "\n".join(buf) + "\n"
+            buf.clear()
+    if buf:
+        yield "\n".join(buf) + "\n"
+
+
+def _csv_chunks(fields: Sequence[str], rows: Iterable[Tuple]) -> Iterator[str]:
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(fields)
+    n = 0
+    for row in rows:
+        writer.writerow(map(_jsonable, row))
+        n += 1
+        if n % CHUNK_ROWS == 0:
+            yield out.getvalue()
+            out.seek(0)
+            out.truncate()
+    yield out.getvalue()
+
+
+def _common_args(formats=FORMATS):
+    """Parse symbol/from/to/format; returns (args, None) or (None, error response)."""
+    symbols = csv_arg("symbol")
+    fmt = request.args.get("format", "ndjson")
+    if fmt not in formats:
+        return None, error("invalid_format", f"format must be one of {list(formats)}")
+    from_dt, to_dt, err = date_range_args()
+    if err:
+        return None, err
+    return (symbols or None, from_dt, to_dt, fmt), None
+
+
+def _stream(name: str, fmt: str, fields: Sequence[str], rows: Iterable[Tuple]) -> Response:
+    chunks = _ndjson_chunks(fields, rows) if fmt == "ndjson" else _csv_chunks(fields, rows)
+    resp = Response(stream_with_context(chunks), mimetype=FORMATS[fmt])
+    resp.headers["Content-Disposition"] = f'attachment; filename="{name}.{fmt}"'
+    return resp
+
+
+def _columnar(name, fmt, symbols, from_dt, to_dt, columns):
+    try:
+        columnar_export.price_schema(columns)  # fails fast if pyarrow is missing
+    except RuntimeError as e:
+        return error("missing_dependency", str(e), 501)
+
+    if fmt == "arrow":
+        chunks = columnar_export.iter_arrow_stream(symbols, from_dt, to_dt, columns)
+        resp = Response(stream_with_context(chunks), mimetype=COLUMNAR_FORMATS[fmt])
+        resp.headers["Content-Disposition"] = f'attachment; filename="{name}.arrows"'
+        return resp
+
+    spool = tempfile.TemporaryFile()
+    columnar_export.write_prices(spool, fmt, symbols, from_dt, to_dt, columns)
+    spool.seek(0)
+    return send_file(
+        spool,
+        mimetype=COLUMNAR_FORMATS[fmt],
+        as_attachment=True,
+        download_name=f"{name}.parquet",
+    )
+
+
+@export_bp.get("/export/prices")
+def export_prices():
+    """Stream stored EOD prices as NDJSON (default), CSV, Arrow IPC or Parquet with flat memory use.
+
+    Query params: symbol (comma-separated, omit for all), from, to,
+    columns (subset of the /prices columns), format (ndjson|csv|arrow|parquet).
+    Arrow/Parquet are built from a COPY stream straight into typed columns;
+    Parquet is spooled to a temp file first since its footer comes last.
+    """
+    args, err = _common_args({**FORMATS, **COLUMNAR_FORMATS})
+    if err:
+        return err
+    symbols, from_dt, to_dt, fmt = args
+
+    columns, err = columns_arg(list(PRICE_COLUMNS))
+    if err:
+        return err
+
+    if fmt in COLUMNAR_FORMATS:
+        return _columnar("eod_prices", fmt, symbols, from_dt, to_dt, columns)
+
+    rows = iter_price_rows(symbols, from_dt, to_dt, columns)
+    return _stream("eod_prices", fmt, ["symbol", "date"] + columns, rows)
+
+
+@export_bp.get("/export/recommendations")
+def export_recommendations():
+    """Stream daily recommendations as NDJSON (default) or CSV.
+
+    Query params: symbol (comma-separated, omit for all), from, to, format (ndjson|csv).
+    """
+    args, err = _common_args()
+    if err:
+        return err
+    symbols, from_dt, to_dt, fmt = args
+
+    rows = iter_recommendation_rows(symbols, from_dt, to_dt)
+    return _stream("daily_recommendations", fmt, RECOMMENDATION_FIELDS, rows)
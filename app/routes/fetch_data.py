@@ -1,116 +1,104 @@
-import os
 from datetime import date
-import requests
+from typing import Any, Dict, List, Tuple
+
 from flask import Blueprint, jsonify, request
 
+from app.services.fmp_client import FmpError
+from app.services.price_store import get_eod_series_async
+
 fmp_bp = Blueprint("fmp", __name__)
 
 
-@fmp_bp.get("/fmp/historical-eod")
-def historical_eod():
-    """Fetch historical EOD data from FMP for the given date window.
+class InvalidRequest(ValueError):
+    """Client error in the request body, reported as a 400."""
 
-    Request JSON body:
-    {
-      "from": "YYYY-MM-DD",
-      "to": "YYYY-MM-DD",
-      "symbol": "BTCUSD"    # optional, defaults to BTCUSD
-    }
+    def __init__(self, code: str, message: str) -> None:
+        super().__init__(f"{code}:{message}")
+        self.code = code
+        self.message = message
 
-    Returns the upstream list payload as-is in data.
-    """
-    api_key = os.getenv("FMP_API_KEY")
-    if not api_key:
-        return (
-            jsonify(
-                {
-                    "error": "missing_api_key",
-                    "message": "Set FMP_API_KEY in environment",
-                }
-            ),
-            400,
-        )
 
-    body = request.get_json(silent=True) or {}
+def parse_eod_request(body: Any) -> Tuple[str, date, date]:
+    """(symbol, from, to) from the JSON body; raises InvalidRequest."""
+    body = body if isinstance(body, dict) else {}
     from_str = body.get("from")
     to_str = body.get("to")
     symbol = (body.get("symbol") or "BTCUSD").strip() or "BTCUSD"
 
     if not isinstance(from_str, str) or not isinstance(to_str, str):
-        return (
-            jsonify({
-                "error": "invalid_request",
-                "message": "Body must include 'from' and 'to' as ISO YYYY-MM-DD strings",
-            }),
-            400,
+        raise InvalidRequest(
+            "invalid_request", "Body must include 'from' and 'to' as ISO YYYY-MM-DD strings"
         )
 
     try:
         from_dt = date.fromisoformat(from_str)
         to_dt = date.fromisoformat(to_str)
     except ValueError:
-        return (
-            jsonify({
-                "error": "invalid_date",
-                "message": "Dates must be ISO YYYY-MM-DD",
-            }),
-            400,
-        )
+        raise InvalidRequest("invalid_date", "Dates must be ISO YYYY-MM-DD")
 
     if from_dt > to_dt:
-        return (
-            jsonify({
-                "error": "invalid_range",
-                "message": "'from' date cannot be after 'to' date",
-            }),
-            400,
-        )
+        raise InvalidRequest("invalid_range", "'from' date cannot be after 'to' date")
 
-    base_url = "https://financialmodelingprep.com/stable/historical-price-eod/full"
-    params = {
-        "symbol": symbol,
-        "from": from_dt.isoformat(),
-        "to": to_dt.isoformat(),
-        "apikey": api_key,
-    }
+    return symbol, from_dt, to_dt
 
-    try:
-        resp = requests.get(base_url, params=params, timeout=20)
-        resp.raise_for_status()
-    except requests.HTTPError as e:
-        status = e.response.status_code if e.response is not None else 502
-        return (
-            jsonify(
-                {"error": "upstream_http_error", "status": status, "message": str(e)}
-            ),
-            status,
-        )
-    except requests.RequestException as e:
-        return jsonify({"error": "upstream_request_failed", "message": str(e)}), 502
 
-    # Parse upstream JSON
-    try:
-        payload = resp.json()
-    except ValueError:
-        return jsonify({"error": "invalid_upstream_json"}), 502
-
-    # Validate upstream payload (expect a list)
-    if not isinstance(payload, list):
-        return (
-            jsonify(
-                {
-                    "error": "invalid_upstream_payload",
-                    "message": "Expected a list",
-                }
-            ),
-            502,
-        )
+def error_body(e: Exception) -> Tuple[Dict[str, Any], int]:
+    """(JSON body, status) for an InvalidRequest, FmpError or other RuntimeError."""
+    if isinstance(e, InvalidRequest):
+        return {"error": e.code, "message": e.message}, 400
+    if isinstance(e, FmpError):
+        if e.code == "upstream_http_error":
+            return {"error": e.code, "status": e.status, "message": e.message}, e.status
+        if e.code == "invalid_upstream_payload":
+            return {"error": e.code, "message": "Expected a list"}, 502
+        if e.message:
+            return {"error": e.code, "message": e.message}, e.status
+        return {"error": e.code}, e.status
+    return {"error": "invalid_upstream_payload", "message": str(e)}, 502
+
 
-    return jsonify({
+def ok_body(
+    symbol: str,
+    from_dt: date,
+    to_dt: date,
+    payload: List[Dict[str, Any]],
+    fetched: List[Tuple[date, date]],
+) -> Dict[str, Any]:
+    return {
         "status": "ok",
         "symbol": symbol,
         "from": from_dt.isoformat(),
         "to": to_dt.isoformat(),
         "count": len(payload),
+        "fetched": [{"from": a.isoformat(), "to": b.isoformat()} for a, b in fetched],
         "data": payload,
-    }), 200
+    }
+
+
+@fmp_bp.get("/fmp/historical-eod")
+async def historical_eod():
+    """Historical EOD data for the given date window, read through the local price store.
+
+    Request JSON body:
+    {
+      "from": "YYYY-MM-DD",
+      "to": "YYYY-MM-DD",
+      "symbol": "BTCUSD"    # optional, defaults to BTCUSD
+    }
+
+    Serves stored rows from eod_prices and only fetches (and persists) date
+    gaps that were never fetched from FMP. data is newest first in the FMP
+    payload shape; fetched lists the upstream ranges requested.
+
+    An async view: the FMP fetch is awaited on the event loop. Under the ASGI
+    entrypoint (asgi.py) each request also gets its own thread, so slow FMP
+    calls do not queue the other routes behind them.
+    """
+    try:
+        symbol, from_dt, to_dt = parse_eod_request(request.get_json(silent=True))
+        payload, fetched = await get_eod_series_async(symbol, from_dt, to_dt)
+    except (InvalidRequest, RuntimeError) as e:
+        body, status = error_body(e)
+        return jsonify(body), status
+
+    return jsonify(ok_body(symbol, from_dt, to_dt, payload, fetched)), 200
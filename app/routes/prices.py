@@ -0,0 +1,92 @@
+import base64
+from datetime import date
+from typing import Tuple
+
+from flask import Blueprint, jsonify, request
+
+from app.routes._params import columns_arg, csv_arg, date_range_args, error
+from app.services.repository import PRICE_COLUMNS, get_price_page
+
+prices_bp = Blueprint("prices", __name__)
+
+DEFAULT_LIMIT = 1000
+MAX_LIMIT = 10000
+
+
+def _encode_cursor(symbol: str, trade_date: date) -> str:
+    raw = f"{symbol}|{trade_date.isoformat()}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Tuple[str, date]:
+    raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+    symbol, _, ds = raw.rpartition("|")
+    return symbol, date.fromisoformat(ds)
+
+
+@prices_bp.get("/prices")
+def prices():
+    """Stored EOD prices with column projection and keyset pagination.
+
+    Query params:
+      symbol   one or more symbols, comma-separated (omit for all)
+      from/to  ISO YYYY-MM-DD bounds, inclusive (optional)
+      columns  comma-separated subset of open,high,low,close,vwap,volume,change,change_percent
+               (default: all)
+      limit    page size (default 1000, max 10000)
+      cursor   next_cursor from the previous page
+      layout   "rows" (default, list of objects) or "columnar" (one array per field)
+    """
+    symbols = csv_arg("symbol")
+
+    columns, err = columns_arg(list(PRICE_COLUMNS))
+    if err:
+        return err
+
+    from_dt, to_dt, err = date_range_args()
+    if err:
+        return err
+
+    try:
+        limit = min(MAX_LIMIT, max(1, int(request.args.get("limit", DEFAULT_LIMIT))))
+    except ValueError:
+        return error("invalid_limit", "limit must be an integer")
+
+    after = None
+    cursor = request.args.get("cursor")
+    if cursor:
+        try:
+            after = _decode_cursor(cursor)
+        except (ValueError, UnicodeDecodeError):
+            return error("invalid_cursor", "cursor is malformed")
+
+    layout = request.args.get("layout", "rows")
+    if layout not in {"rows", "columnar"}:
+        return error("invalid_layout", "layout must be 'rows' or 'columnar'")
+
+    # Fetch one extra row to know whether another page exists
+    rows = get_price_page(symbols or None, from_dt, to_dt, columns, after, limit + 1)
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(rows[-1][0], rows[-1][1])
+
+    fields = ["symbol", "date"] + columns
+    if layout == "columnar":
+        data = {
+            name: [r[i].isoformat() if i == 1 else r[i] for r in rows]
+            for i, name in enumerate(fields)
+        }
+    else:
+        data = [
+            dict(zip(fields, (r[0], r[1].isoformat(), *r[2:])))
+            for r in rows
+        ]
+
+    return jsonify({
+        "status": "ok",
+        "layout": layout,
+        "count": len(rows),
+        "next_cursor": next_cursor,
+        "data": data,
+    }), 200
@@ -1,11 +1,18 @@
-from typing import Optional, Any
-from flask import Blueprint, jsonify, request
-from sqlalchemy import desc, select
+import hashlib
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from flask import Blueprint, Response, jsonify, request
 from app.db import SessionLocal
 from app.models import DailyRecommendation
+from app.services.cache import MISSING, latest_recommendation_cache
+from app.services.repository import latest_recommendation_query, latest_recommendations_query
 
 recs_bp = Blueprint("recommendations", __name__)
 
+# Max symbols per batch lookup
+MAX_BATCH = int(os.getenv("RECS_BATCH_MAX", "500"))
+
 
 def _to_float(x: Any) -> Optional[float]:
     if x is None:
@@ -13,18 +20,135 @@ def _to_float(x: Any) -> Optional[float]:
     return float(x)
 
 
-@recs_bp.get("/recommendations/latest")
-def latest_recommendation():
-    symbol = request.args.get("symbol", "BTCUSD")
+def _conditional(body: dict, recs: Optional[List[dict]] = None) -> Response:
+    """JSON response with strong ETag/Last-Modified; 304 with no body when the client is current.
+
+    The validators come from `recs` (default: body itself as one recommendation).
+    """
+    recs = [body] if recs is None else recs
+    resp = jsonify(body)
+    tag = hashlib.sha1(
+        ",".join(f"{r['id']}|{r['created_at']}" for r in recs).encode()
+    ).hexdigest()[:20]
+    resp.set_etag(tag)
+    if recs:
+        resp.last_modified = max(datetime.fromisoformat(r["created_at"]) for r in recs)
+    # Cacheable, but revalidated on every use: a new recommendation can land at any
+    # time (late or failed jobs), and an unchanged one costs only a 304
+    resp.headers["Cache-Control"] = "public, no-cache"
+    return resp.make_conditional(request)
+
+
+def _serialize(rec: DailyRecommendation) -> dict:
+    return {
+        "id": rec.id,
+        "symbol": rec.symbol,
+        "trade_date": rec.trade_date.isoformat(),
+        "model_name": rec.model_name,
+        "recommendation": rec.recommendation,
+        "rationale": rec.rationale,
+        "change_percent": _to_float(getattr(rec, "change_percent", None)),
+        "window_days": rec.window_days,
+        "created_at": rec.created_at.isoformat(),
+    }
 
+
+def _load_latest(symbol: str) -> Optional[dict]:
     with SessionLocal() as session:
-        stmt = select(DailyRecommendation).where(DailyRecommendation.symbol == symbol)
-        stmt = stmt.order_by(
-            desc(DailyRecommendation.trade_date), desc(DailyRecommendation.created_at)
-        ).limit(1)
-        rec = session.scalars(stmt).first()
+        rec = session.scalars(latest_recommendation_query(symbol)).first()
+        return _serialize(rec) if rec else None
+
+
+def _load_latest_many(symbols: List[str]) -> Dict[str, Optional[dict]]:
+    """Latest recommendation per symbol: cache hits first, all misses in one query."""
+    found: Dict[str, Optional[dict]] = {}
+    misses: List[str] = []
+    for symbol in symbols:
+        body = latest_recommendation_cache.get(symbol)
+        if body is MISSING:
+            misses.append(symbol)
+        else:
+            found[symbol] = body
+
+    if misses:
+        with SessionLocal() as session:
+            loaded = {
+                rec.symbol: _serialize(rec)
+                for rec in session.scalars(latest_recommendations_query(misses))
+            }
+        for symbol in misses:
+            found[symbol] = loaded.get(symbol)
+            if found[symbol] is not None:
+                latest_recommendation_cache.set(symbol, found[symbol])
+
+    return {symbol: found[symbol] for symbol in symbols}
+
+
+def _batch_symbols() -> Optional[List[str]]:
+    """Symbols for a batch lookup (POST body or ?symbols=), uppercased and deduplicated."""
+    if request.method == "POST":
+        payload = request.get_json(silent=True) or {}
+        raw = payload.get("symbols") if isinstance(payload, dict) else None
+        if not isinstance(raw, list) or not all(isinstance(s, str) for s in raw):
+            return None
+    else:
+        raw = request.args.get("symbols", "").split(",")
+    return list(dict.fromkeys(s.strip().upper() for s in raw if s.strip()))
+
 
-    if not rec:
+def _latest_batch():
+    symbols = _batch_symbols()
+    if not symbols:
+        return (
+            jsonify(
+                {
+                    "error": "invalid_symbols",
+                    "message": "Provide symbols as ?symbols=A,B or a JSON body {\"symbols\": [...]}",
+                }
+            ),
+            400,
+        )
+    if len(symbols) > MAX_BATCH:
+        return (
+            jsonify(
+                {
+                    "error": "too_many_symbols",
+                    "message": f"At most {MAX_BATCH} symbols per request",
+                }
+            ),
+            400,
+        )
+
+    recs = _load_latest_many(symbols)
+    body = {
+        "status": "ok",
+        "count": sum(1 for r in recs.values() if r),
+        "missing": [s for s, r in recs.items() if not r],
+        "recommendations": recs,
+    }
+    return _conditional(body, [r for r in recs.values() if r])
+
+
+@recs_bp.route("/recommendations/latest", methods=["GET", "POST"])
+def latest_recommendation():
+    """Latest recommendation for ?symbol= (default BTCUSD).
+
+    Batch form: ?symbols=A,B,C or POST {"symbols": [...]} returns a map of
+    symbol -> recommendation (null when none exists), resolved in one query.
+    """
+    if request.method == "POST" or "symbols" in request.args:
+        return _latest_batch()
+
+    # Normalised like the batch form, so ?symbol=btcusd and ?symbols=btcusd agree
+    symbol = request.args.get("symbol", "").strip().upper() or "BTCUSD"
+
+    body = latest_recommendation_cache.get(symbol)
+    if body is MISSING:
+        body = _load_latest(symbol)
+        if body is not None:
+            latest_recommendation_cache.set(symbol, body)
+
+    if not body:
         return (
             jsonify(
                 {
@@ -36,19 +160,4 @@ def latest_recommendation():
             404,
         )
 
-    return (
-        jsonify(
-            {
-                "id": rec.id,
-                "symbol": rec.symbol,
-                "trade_date": rec.trade_date.isoformat(),
-                "model_name": rec.model_name,
-                "recommendation": rec.recommendation,
-                "rationale": rec.rationale,
-                "change_percent": _to_float(getattr(rec, "change_percent", None)),
-                "window_days": rec.window_days,
-                "created_at": rec.created_at.isoformat(),
-            }
-        ),
-        200,
-    )
+    return _conditional(body)
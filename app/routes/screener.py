@@ -0,0 +1,66 @@
+from flask import Blueprint, jsonify, request
+
+from app.routes._params import csv_arg, date_arg, error, float_arg
+from app.services.llm_service import RECOMMENDATIONS
+from app.services.repository import SCREENER_FIELDS, get_screener
+
+screener_bp = Blueprint("screener", __name__)
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 10000
+
+
+@screener_bp.get("/screener")
+def screener():
+    """Latest recommendation and rolling price stats for many symbols in one query.
+
+    Query params:
+      symbol          comma-separated symbols (omit for all)
+      recommendation  comma-separated subset of buy,sell,hold
+      since           ISO YYYY-MM-DD; only symbols whose latest recommendation is on/after it
+      min_change      minimum change_percent (fraction) of the latest recommendation
+      max_change      maximum change_percent (fraction)
+      sort            any result field, "-" prefix for descending (default: symbol)
+      limit           max rows (default 100, max 10000)
+    """
+    symbols = list(dict.fromkeys(s.upper() for s in csv_arg("symbol")))
+    recommendations = [r.lower() for r in csv_arg("recommendation")]
+    bad = [r for r in recommendations if r not in RECOMMENDATIONS]
+    if bad:
+        return error(
+            "invalid_recommendation", f"Unknown values {bad}; choose from {list(RECOMMENDATIONS)}"
+        )
+
+    sort = request.args.get("sort", "symbol")
+    descending = sort.startswith("-")
+    sort = sort.lstrip("-")
+    if sort not in SCREENER_FIELDS:
+        return error("invalid_sort", f"sort must be one of {list(SCREENER_FIELDS)}")
+
+    try:
+        since = date_arg("since")
+    except ValueError:
+        return error("invalid_date", "since must be ISO YYYY-MM-DD")
+
+    try:
+        min_change = float_arg("min_change")
+        max_change = float_arg("max_change")
+    except ValueError:
+        return error("invalid_change", "min_change/max_change must be numbers")
+
+    try:
+        limit = min(MAX_LIMIT, max(1, int(request.args.get("limit", DEFAULT_LIMIT))))
+    except ValueError:
+        return error("invalid_limit", "limit must be an integer")
+
+    results = get_screener(
+        symbols=symbols or None,
+        recommendations=recommendations or None,
+        since=since,
+        min_change=min_change,
+        max_change=max_change,
+        sort=sort,
+        descending=descending,
+        limit=limit,
+    )
+    return jsonify({"status": "ok", "count": len(results), "results": results})
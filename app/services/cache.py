@@ -0,0 +1,83 @@
+"""In-process caches for hot, rarely-changing reads.
+
+Each gunicorn worker holds its own copy. Invalidation only reaches the process
+that calls it; the production writer (the daily job) is a separate process, so
+cached entries may lag its writes by up to the TTL.
+"""
+from __future__ import annotations
+
+import os
+import threading
+from typing import Any, Dict, Hashable
+
+from cachetools import TTLCache
+
+
+MISSING = object()
+
+
+class LocalTTLCache:
+    """Thread-safe wrapper around cachetools.TTLCache (LRU eviction once full).
+
+    A ttl of 0 disables caching entirely.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.enabled = maxsize > 0 and ttl > 0
+        self._cache: TTLCache = TTLCache(maxsize=max(1, maxsize), ttl=max(ttl, 0.001))
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Any:
+        """Return the cached value or MISSING."""
+        if not self.enabled:
+            return MISSING
+        with self._lock:
+            value = self._cache.get(key, MISSING)
+            if value is MISSING:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._cache[key] = value
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._cache.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "size": len(self._cache),
+                "maxsize": self._cache.maxsize,
+                "ttl": self._cache.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+def _env_number(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+# Latest recommendation per symbol, keyed by symbol; values are the serialized
+# response body. Misses are not cached, so a symbol's first recommendation is
+# visible as soon as it is written.
+latest_recommendation_cache = LocalTTLCache(
+    maxsize=int(_env_number("RECS_CACHE_MAXSIZE", 1024)),
+    ttl=_env_number("RECS_CACHE_TTL", 300),
+)
@@ -0,0 +1,31 @@
+"""Process-wide, lazily created upstream clients.
+
+Building a genai.Client per call pays TCP/TLS handshakes and client setup
+every time; these helpers hand out one shared instance per process
+(thread-safe, created on first use). FMP has its own async client in
+services.fmp_client.
+"""
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict
+
+
+_lock = threading.Lock()
+_genai_clients: Dict[str, Any] = {}
+
+
+def get_genai_client(api_key: str) -> Any:
+    """Shared google-genai Client per API key."""
+    client = _genai_clients.get(api_key)
+    if client is None:
+        with _lock:
+            client = _genai_clients.get(api_key)
+            if client is None:
+                try:
+                    from google import genai  # type: ignore[import-not-found]
+                except Exception:
+                    raise RuntimeError("missing_dependency: install google-genai")
+                client = genai.Client(api_key=api_key)
+                _genai_clients[api_key] = client
+    return client
@@ -0,0 +1,164 @@
+"""Columnar (Arrow IPC / Parquet) export of eod_prices.
+
+Rows never become Python objects: Postgres streams `COPY (SELECT ...) TO STDOUT`
+CSV bytes, which pyarrow's CSV reader parses straight into typed record
+batches (numerics are cast to float8 in SQL). pyarrow is imported lazily so the
+rest of the app runs without it.
+"""
+from __future__ import annotations
+
+import io
+import itertools
+from datetime import date
+from typing import Any, BinaryIO, Iterator, List, Optional
+
+from sqlalchemy.dialects import postgresql
+
+from app.db import engine
+from app.models import EodPrice
+from app.services.repository import build_price_query
+
+
+FORMATS = ("arrow", "parquet")
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa  # type: ignore[import-not-found]
+        import pyarrow.csv as pa_csv  # type: ignore[import-not-found]
+    except Exception:
+        raise RuntimeError("missing_dependency: install pyarrow")
+    return pa, pa_csv
+
+
+class _CopyStream(io.RawIOBase):
+    """Read-only file object over an iterator of COPY byte blocks."""
+
+    def __init__(self, blocks: Iterator[bytes]) -> None:
+        self._blocks = blocks
+        self._buf = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b: Any) -> int:
+        while not self._buf:
+            try:
+                self._buf = bytes(next(self._blocks))
+            except StopIteration:
+                return 0
+        n = min(len(b), len(self._buf))
+        b[:n] = self._buf[:n]
+        self._buf = self._buf[n:]
+        return n
+
+
+def price_schema(columns: List[str]):
+    pa, _ = _pyarrow()
+    types = {"volume": pa.int64()}
+    return pa.schema(
+        [("symbol", pa.string()), ("date", pa.date32())]
+        + [(c, types.get(c, pa.float64())) for c in columns]
+    )
+
+
+def iter_price_batches(
+    symbols: Optional[List[str]],
+    from_date: Optional[date],
+    to_date: Optional[date],
+    columns: List[str],
+    block_size: int = 4 << 20,
+) -> Iterator[Any]:
+    """Yield pyarrow RecordBatches of (symbol, date, *columns) ordered by (symbol, trade_date).
+
+    Yields nothing when no rows match; callers write a schema-only file then.
+    """
+    pa, pa_csv = _pyarrow()
+    schema = price_schema(columns)
+    q = build_price_query(symbols, from_date, to_date, columns).order_by(
+        EodPrice.symbol, EodPrice.trade_date
+    )
+    # COPY takes no bind parameters; literal_binds renders (escaped) values inline
+    sql = str(q.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+    with engine.connect() as conn:
+        dbapi_conn = conn.connection.driver_connection
+        with dbapi_conn.cursor() as cur:
+            with cur.copy(f"COPY ({sql}) TO STDOUT (FORMAT CSV)") as copy:
+                blocks = iter(copy)
+                # pyarrow's CSV reader rejects empty input, so peek for a first block
+                first = next((b for b in blocks if b), None)
+                if first is None:
+                    return
+                reader = pa_csv.open_csv(
+                    _CopyStream(itertools.chain([first], blocks)),
+                    read_options=pa_csv.ReadOptions(
+                        column_names=schema.names, block_size=block_size
+                    ),
+                    convert_options=pa_csv.ConvertOptions(
+                        column_types={f.name: f.type for f in schema}
+                    ),
+                )
+                for batch in reader:
+                    yield batch
+
+
+def write_prices(
+    sink: BinaryIO,
+    fmt: str,
+    symbols: Optional[List[str]],
+    from_date: Optional[date],
+    to_date: Optional[date],
+    columns: List[str],
+) -> int:
+    """Write prices to a binary sink as Arrow IPC stream or Parquet. Returns rows written."""
+    pa, _ = _pyarrow()
+    schema = price_schema(columns)
+    rows = 0
+    if fmt == "arrow":
+        with pa.ipc.new_stream(sink, schema) as writer:
+            for batch in iter_price_batches(symbols, from_date, to_date, columns):
+                writer.write_batch(batch)
+                rows += batch.num_rows
+    elif fmt == "parquet":
+        import pyarrow.parquet as pq  # type: ignore[import-not-found]
+
+        with pq.ParquetWriter(sink, schema, compression="zstd") as writer:
+            for batch in iter_price_batches(symbols, from_date, to_date, columns):
+                writer.write_batch(batch)
+                rows += batch.num_rows
+    else:
+        raise ValueError(f"unknown format: {fmt}")
+    return rows
+
+
+class _ChunkSink(io.RawIOBase):
+    """Writable file object that collects bytes for a streaming response."""
+
+    def __init__(self) -> None:
+        self.chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b: Any) -> int:
+        self.chunks.append(bytes(b))
+        return len(b)
+
+
+def iter_arrow_stream(
+    symbols: Optional[List[str]],
+    from_date: Optional[date],
+    to_date: Optional[date],
+    columns: List[str],
+) -> Iterator[bytes]:
+    """Arrow IPC stream bytes, yielded batch by batch (for HTTP streaming)."""
+    pa, _ = _pyarrow()
+    sink = _ChunkSink()
+    writer = pa.ipc.new_stream(sink, price_schema(columns))
+    for batch in iter_price_batches(symbols, from_date, to_date, columns):
+        writer.write_batch(batch)
+        yield b"".join(sink.chunks)
+        sink.chunks.clear()
+    writer.close()
+    yield b"".join(sink.chunks)
@@ -0,0 +1,257 @@
+"""Async FMP client: token-bucket rate limiting, jittered retries and request coalescing.
+
+One AsyncFmpClient runs on a process-wide background event loop so that every
+caller (gthread request handlers, batch job worker threads) shares the same
+rate limiter, connection pool and in-flight request table. Sync code calls
+run_sync(); async code awaits run_async(). httpx and tenacity are imported on
+first use, keeping them out of worker startup.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import Future as ConcurrentFuture
+from datetime import date
+from typing import TYPE_CHECKING, Any, Awaitable, Dict, Hashable, Optional, Tuple, TypeVar
+
+from app.services import metrics
+
+if TYPE_CHECKING:
+    import httpx
+
+
+FMP_BASE_URL = "https://financialmodelingprep.com/stable"
+
+T = TypeVar("T")
+
+
+class FmpError(RuntimeError):
+    """Upstream FMP failure. str() keeps the historical "code:detail" RuntimeError format."""
+
+    def __init__(
+        self,
+        code: str,
+        message: str = "",
+        status: int = 502,
+        retry_after: Optional[float] = None,
+    ) -> None:
+        super().__init__(f"{code}:{message}" if message else code)
+        self.code = code
+        self.message = message
+        self.status = status
+        self.retry_after = retry_after
+
+    @property
+    def retryable(self) -> bool:
+        return self.code == "upstream_request_failed" or self.status == 429 or self.status >= 500
+
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens per second, bursts up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        # Waiters queue on the lock, so tokens are handed out in arrival order
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def _retry_after(resp: "httpx.Response") -> Optional[float]:
+    try:
+        return float(resp.headers.get("Retry-After", ""))
+    except ValueError:
+        return None
+
+
+class AsyncFmpClient:
+    """httpx-based FMP client. All coroutines must run on the same event loop."""
+
+    def __init__(
+        self,
+        base_url: str = FMP_BASE_URL,
+        rate_per_minute: Optional[float] = None,
+        burst: Optional[float] = None,
+        max_attempts: Optional[int] = None,
+        timeout: float = 20.0,
+    ) -> None:
+        self.base_url = base_url
+        self.timeout = timeout
+        rpm = rate_per_minute or _env_float("FMP_RATE_LIMIT_PER_MIN", 300)
+        self.bucket = TokenBucket(rpm / 60.0, burst or _env_float("FMP_RATE_BURST", 10))
+        self.max_attempts = max_attempts or int(_env_float("FMP_MAX_ATTEMPTS", 4))
+        # Longest single backoff; a longer Retry-After fails the call instead of waiting
+        self.max_retry_wait = _env_float("FMP_MAX_RETRY_WAIT", 10)
+        self._http: Optional["httpx.AsyncClient"] = None
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+    def _client(self) -> "httpx.AsyncClient":
+        if self._http is None:
+            import httpx
+
+            maxsize = int(_env_float("HTTP_POOL_MAXSIZE", 10))
+            self._http = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=maxsize, max_keepalive_connections=maxsize),
+            )
+        return self._http
+
+    async def aclose(self) -> None:
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    async def _get_once(self, path: str, params: Dict[str, str]) -> Any:
+        await self.bucket.acquire()
+        import httpx
+
+        # Timed after the rate limiter so queueing is not counted as upstream latency
+        with metrics.observe_upstream("fmp", path):
+            try:
+                resp = await self._client().get(path, params=params)
+            except httpx.HTTPError as e:
+                raise FmpError("upstream_request_failed", str(e) or type(e).__name__)
+            if resp.status_code >= 400:
+                raise FmpError(
+                    "upstream_http_error",
+                    f"{resp.status_code}:{resp.reason_phrase}",
+                    status=resp.status_code,
+                    retry_after=_retry_after(resp),
+                )
+            try:
+                return resp.json()
+            except ValueError:
+                raise FmpError("invalid_upstream_json")
+
+    async def _get_with_retry(self, path: str, params: Dict[str, str]) -> Any:
+        from tenacity import (
+            AsyncRetrying,
+            retry_if_exception,
+            stop_after_attempt,
+            wait_random_exponential,
+        )
+
+        jitter = wait_random_exponential(multiplier=0.5, max=self.max_retry_wait)
+
+        def wait(state) -> float:
+            # Honour Retry-After on 429 when it asks for longer than our backoff
+            exc = state.outcome.exception() if state.outcome else None
+            return min(self.max_retry_wait, max(jitter(state), getattr(exc, "retry_after", None) or 0.0))
+
+        def should_retry(e: BaseException) -> bool:
+            # A Retry-After beyond the cap is raised as-is (e.g. the 429) rather than slept on
+            return (
+                isinstance(e, FmpError)
+                and e.retryable
+                and (e.retry_after or 0.0) <= self.max_retry_wait
+            )
+
+        async for attempt in AsyncRetrying(
+            retry=retry_if_exception(should_retry),
+            wait=wait,
+            stop=stop_after_attempt(self.max_attempts),
+            reraise=True,
+        ):
+            with attempt:
+                return await self._get_once(path, params)
+
+    async def get_json(self, path: str, params: Dict[str, str]) -> Any:
+        """GET path with params; identical concurrent calls share one upstream request."""
+        api_key = os.getenv("FMP_API_KEY")
+        if not api_key:
+            raise FmpError("missing_api_key", "Set FMP_API_KEY in environment", status=400)
+
+        key: Tuple = (path, tuple(sorted(params.items())))
+        fut = self._inflight.get(key)
+        if fut is None:
+            fut = asyncio.ensure_future(self._get_with_retry(path, {**params, "apikey": api_key}))
+            self._inflight[key] = fut
+            fut.add_done_callback(lambda _f: self._inflight.pop(key, None))
+        # shield: one caller being cancelled must not cancel the shared request
+        return await asyncio.shield(fut)
+
+    async def historical_eod(self, symbol: str, from_date: date, to_date: date) -> list:
+        """Raw list payload of /historical-price-eod/full for [from_date, to_date]."""
+        payload = await self.get_json(
+            "/historical-price-eod/full",
+            {"symbol": symbol, "from": from_date.isoformat(), "to": to_date.isoformat()},
+        )
+        if not isinstance(payload, list):
+            raise FmpError("invalid_upstream_payload", "expected a list")
+        return payload
+
+
+_lock = threading.Lock()
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_client: Optional[AsyncFmpClient] = None
+
+
+def _background_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    if _loop is None:
+        with _lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="fmp-client", daemon=True).start()
+                _loop = loop
+    return _loop
+
+
+def get_client() -> AsyncFmpClient:
+    """Process-wide client; its coroutines must be run through run_sync/run_async."""
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                _client = AsyncFmpClient()
+    return _client
+
+
+async def _with_deadline(coro: Awaitable[T], timeout: float) -> T:
+    try:
+        return await asyncio.wait_for(coro, timeout)
+    except asyncio.TimeoutError:
+        raise FmpError("upstream_timeout", f"no result within {timeout:g}s", status=504)
+
+
+def _submit(coro: Awaitable[T]) -> "ConcurrentFuture[T]":
+    # Overall deadline (retries and rate-limit waits included), below gunicorn's -t 60
+    deadline = _env_float("FMP_CALL_DEADLINE", 45)
+    return asyncio.run_coroutine_threadsafe(
+        _with_deadline(coro, deadline), _background_loop()  # type: ignore[arg-type]
+    )
+
+
+def run_sync(coro: Awaitable[T]) -> T:
+    """Run a client coroutine on the background loop and block for its result.
+
+    Raises FmpError("upstream_timeout") after FMP_CALL_DEADLINE seconds.
+    """
+    return _submit(coro).result()
+
+
+async def run_async(coro: Awaitable[T]) -> T:
+    """Await a client coroutine from any other event loop without blocking it."""
+    return await asyncio.wrap_future(_submit(coro))
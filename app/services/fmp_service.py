@@ -1,41 +1,20 @@
-import os
+import asyncio
 from datetime import date
-import requests
+from typing import Iterator, List, Sequence, Tuple
 
+from app.services.fmp_client import get_client, run_async, run_sync
 
-def fetch_eod_for_date(symbol: str, target_date: date) -> dict:
-    """Fetch EOD data for a specific date using FMP API.
-    Mirrors the behavior of the /fmp/historical-eod endpoint: calls the stable EOD endpoint,
-    expects a non-empty list with one object, validates ISO date, and returns that object.
-    Raises RuntimeError on any upstream or validation errors.
-    """
-    api_key = os.getenv("FMP_API_KEY")
-    if not api_key:
-        raise RuntimeError("missing_api_key: Set FMP_API_KEY in environment")
 
-    base_url = (
-        "https://financialmodelingprep.com/stable/historical-price-eod/full"
-        f"?symbol={symbol}&from={target_date:%Y-%m-%d}&to={target_date:%Y-%m-%d}&apikey=" + api_key
-    )
-    try:
-        resp = requests.get(base_url, timeout=20)
-        resp.raise_for_status()
-    except requests.HTTPError as e:
-        status = e.response.status_code if e.response is not None else 502
-        raise RuntimeError(f"upstream_http_error:{status}:{e}")
-    except requests.RequestException as e:
-        raise RuntimeError(f"upstream_request_failed:{e}")
-
-    try:
-        payload = resp.json()
-    except ValueError:
-        raise RuntimeError("invalid_upstream_json")
+def _fetch_eod_payload(symbol: str, from_date: date, to_date: date) -> list:
+    """Call the stable EOD endpoint for [from_date, to_date] and return the raw list payload.
+    Goes through the shared async FMP client (rate limited, retried, coalesced).
+    Raises RuntimeError (FmpError) on any upstream or validation errors.
+    """
+    return run_sync(get_client().historical_eod(symbol, from_date, to_date))
 
-    if not isinstance(payload, list) or not payload:
-        raise RuntimeError("invalid_upstream_payload: expected a non-empty list")
 
-    r = payload[0]
-    ds = r.get("date")
+def _validate_row(r: dict) -> dict:
+    ds = r.get("date") if isinstance(r, dict) else None
     if not isinstance(ds, str):
         raise RuntimeError("invalid_upstream_date: missing or invalid date")
 
@@ -45,3 +24,51 @@ def fetch_eod_for_date(symbol: str, target_date: date) -> dict:
         raise RuntimeError("invalid_upstream_date: not ISO YYYY-MM-DD")
 
     return r
+
+
+def fetch_eod_for_date(symbol: str, target_date: date) -> dict:
+    """Fetch EOD data for a specific date using FMP API.
+    Mirrors the behavior of the /fmp/historical-eod endpoint: calls the stable EOD endpoint,
+    expects a non-empty list with one object, validates ISO date, and returns that object.
+    Raises RuntimeError on any upstream or validation errors.
+    """
+    payload = _fetch_eod_payload(symbol, target_date, target_date)
+    if not payload:
+        raise RuntimeError("invalid_upstream_payload: expected a non-empty list")
+
+    return _validate_row(payload[0])
+
+
+def iter_eod_range(symbol: str, from_date: date, to_date: date) -> Iterator[dict]:
+    """Fetch a whole date window in one FMP call and yield validated rows one at a time.
+    FMP returns newest first; rows are yielded in upstream order.
+    Raises RuntimeError on any upstream or validation errors.
+    """
+    if from_date > to_date:
+        raise RuntimeError("invalid_range: 'from' date cannot be after 'to' date")
+
+    for r in _fetch_eod_payload(symbol, from_date, to_date):
+        yield _validate_row(r)
+
+
+def fetch_eod_range(symbol: str, from_date: date, to_date: date) -> List[dict]:
+    """Fetch every EOD row in [from_date, to_date] with a single upstream request."""
+    return list(iter_eod_range(symbol, from_date, to_date))
+
+
+async def _gather_ranges(symbol: str, ranges: Sequence[Tuple[date, date]]) -> List[list]:
+    client = get_client()
+    return await asyncio.gather(
+        *(client.historical_eod(symbol, start, end) for start, end in ranges)
+    )
+
+
+def fetch_eod_ranges(symbol: str, ranges: Sequence[Tuple[date, date]]) -> List[List[dict]]:
+    """Fetch several date windows concurrently (one FMP call each) and return validated rows per window."""
+    return [[_validate_row(r) for r in payload] for payload in run_sync(_gather_ranges(symbol, ranges))]
+
+
+async def fetch_eod_ranges_async(symbol: str, ranges: Sequence[Tuple[date, date]]) -> List[List[dict]]:
+    """fetch_eod_ranges for async callers: awaits the shared client without blocking a thread."""
+    payloads = await run_async(_gather_ranges(symbol, ranges))
+    return [[_validate_row(r) for r in payload] for payload in payloads]
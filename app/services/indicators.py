@@ -0,0 +1,147 @@
+"""Deterministic technical indicators computed from EOD rows before the LLM call.
+
+All inputs are ordered oldest -> newest. Window statistics (change, volatility,
+volume vs. average) use the last `window_days` rows; SMA/EMA/RSI/ATR use the
+full history passed in, so callers should load window + indicator warm-up rows.
+Indicators that do not have enough history are returned as None.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, Optional
+
+import numpy as np
+
+
+def price_arrays(prices: Iterable[Any]) -> Dict[str, np.ndarray]:
+    """Build float64 column arrays from EodPrice-like rows (oldest -> newest).
+
+    Missing volume becomes NaN so averages can ignore it.
+    """
+    rows = list(prices)
+    n = len(rows)
+
+    def col(name: str) -> np.ndarray:
+        return np.fromiter(
+            (np.nan if getattr(p, name) is None else float(getattr(p, name)) for p in rows),
+            dtype=np.float64,
+            count=n,
+        )
+
+    return {
+        "open": col("open"),
+        "high": col("high"),
+        "low": col("low"),
+        "close": col("close"),
+        "volume": col("volume"),
+    }
+
+
+def sma(x: np.ndarray, window: int) -> Optional[float]:
+    if window <= 0 or x.size < window:
+        return None
+    return float(x[-window:].mean())
+
+
+def _ewm_last(x: np.ndarray, alpha: float, seed: float) -> float:
+    # Recursive smoothing; series here are short so a scalar loop is cheapest
+    value = seed
+    for v in x:
+        value += alpha * (v - value)
+    return float(value)
+
+
+def ema(x: np.ndarray, window: int) -> Optional[float]:
+    """EMA seeded with the SMA of the first `window` values."""
+    if window <= 0 or x.size < window:
+        return None
+    return _ewm_last(x[window:], 2.0 / (window + 1), float(x[:window].mean()))
+
+
+def rsi(close: np.ndarray, window: int = 14) -> Optional[float]:
+    """Wilder's RSI (0-100)."""
+    if window <= 0 or close.size <= window:
+        return None
+    delta = np.diff(close)
+    gains = np.clip(delta, 0.0, None)
+    losses = np.clip(-delta, 0.0, None)
+    alpha = 1.0 / window
+    avg_gain = _ewm_last(gains[window:], alpha, float(gains[:window].mean()))
+    avg_loss = _ewm_last(losses[window:], alpha, float(losses[:window].mean()))
+    if avg_loss == 0.0:
+        return 100.0 if avg_gain > 0.0 else 50.0
+    return float(100.0 - 100.0 / (1.0 + avg_gain / avg_loss))
+
+
+def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, window: int = 14) -> Optional[float]:
+    """Wilder's Average True Range."""
+    if window <= 0 or close.size <= window:
+        return None
+    prev_close = close[:-1]
+    tr = np.maximum.reduce(
+        [high[1:] - low[1:], np.abs(high[1:] - prev_close), np.abs(low[1:] - prev_close)]
+    )
+    return _ewm_last(tr[window:], 1.0 / window, float(tr[:window].mean()))
+
+
+def _round(x: Optional[float], digits: int = 6) -> Optional[float]:
+    if x is None or not np.isfinite(x):
+        return None
+    return round(float(x), digits)
+
+
+def compute_features(
+    prices: Iterable[Any],
+    window_days: int = 7,
+    sma_window: int = 5,
+    ema_window: int = 5,
+    rsi_window: int = 14,
+    atr_window: int = 14,
+) -> Dict[str, Any]:
+    """Compact feature vector for one symbol from EodPrice-like rows (oldest -> newest).
+
+    change_percent is a fraction ((last_close - first_close) / first_close) over
+    the analysis window, matching what the LLM used to be asked to compute.
+    """
+    rows = list(prices)
+    arr = price_arrays(rows)
+    close, high, low, volume = arr["close"], arr["high"], arr["low"], arr["volume"]
+
+    w = min(window_days, close.size)
+    features: Dict[str, Any] = {
+        "symbol": rows[-1].symbol if rows else None,
+        "as_of": rows[-1].trade_date.isoformat() if rows else None,
+        "window_days": w,
+    }
+    if w < 2:
+        features["insufficient_data"] = True
+        features["change_percent"] = 0.0
+        return features
+
+    wc, wh, wl, wv = close[-w:], high[-w:], low[-w:], volume[-w:]
+    first, last = wc[0], wc[-1]
+
+    # Least-squares slope of closes per day, relative to the last close
+    slope = np.polyfit(np.arange(w, dtype=np.float64), wc, 1)[0]
+    trend = slope / last if last else 0.0
+
+    avg_volume = np.nanmean(wv) if np.isfinite(wv).any() else np.nan
+    last_sma = sma(close, sma_window)
+
+    features.update(
+        {
+            "last_close": _round(last),
+            "change_percent": _round((last - first) / first if first else 0.0),
+            "trend_slope_pct_per_day": _round(trend),
+            "trend": "up" if trend > 0.001 else "down" if trend < -0.001 else "flat",
+            "momentum_1d_pct": _round((wc[-1] - wc[-2]) / wc[-2] if wc[-2] else None),
+            "up_days": int((np.diff(wc) > 0).sum()),
+            "volatility": _round((wh.max() - wl.min()) / last if last else None),
+            "volume_vs_avg": _round(wv[-1] / avg_volume if avg_volume else None),
+            f"sma_{sma_window}": _round(last_sma),
+            "close_vs_sma": _round(last / last_sma - 1.0 if last_sma else None),
+            f"ema_{ema_window}": _round(ema(close, ema_window)),
+            f"rsi_{rsi_window}": _round(rsi(close, rsi_window), 2),
+            f"atr_{atr_window}": _round(atr(high, low, close, atr_window)),
+        }
+    )
+    return features
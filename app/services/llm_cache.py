@@ -0,0 +1,107 @@
+"""Persistent, content-addressed cache of LLM responses (table llm_response_cache).
+
+Keys are sha256(model, prompt version, canonical JSON of the input), so reruns,
+retries and backfills over unchanged data reuse the stored answer instead of
+paying for another model call. Entries expire after LLM_CACHE_TTL_DAYS and the
+table is trimmed to LLM_CACHE_MAX_ROWS by evict().
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.db import SessionLocal
+from app.models import LlmResponseCache
+
+
+def _ttl() -> timedelta:
+    try:
+        days = float(os.getenv("LLM_CACHE_TTL_DAYS", "30"))
+    except ValueError:
+        days = 30.0
+    return timedelta(days=days)
+
+
+def enabled() -> bool:
+    return os.getenv("LLM_CACHE", "1").lower() in {"1", "true", "yes", "on"}
+
+
+def cache_key(model: str, prompt_version: str, data: Any) -> str:
+    canonical = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+    h = hashlib.sha256()
+    for part in (model, prompt_version, canonical):
+        h.update(part.encode())
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def get(key: str) -> Optional[Any]:
+    """Return the cached response for key if present and not expired (records the hit)."""
+    stmt = (
+        update(LlmResponseCache)
+        .where(
+            (LlmResponseCache.cache_key == key)
+            & (LlmResponseCache.expires_at > func.now())
+        )
+        .values(
+            hit_count=LlmResponseCache.hit_count + 1, last_hit_at=func.now()
+        )
+        .returning(LlmResponseCache.response)
+    )
+    with SessionLocal() as session:
+        row = session.execute(stmt).first()
+        session.commit()
+        return row[0] if row else None
+
+
+def put(key: str, model: str, prompt_version: str, response: Any) -> None:
+    """Store (or refresh) a response under key."""
+    expires_at = datetime.now(timezone.utc) + _ttl()
+    stmt = pg_insert(LlmResponseCache).values(
+        cache_key=key,
+        model_name=model,
+        prompt_version=prompt_version,
+        response=response,
+        expires_at=expires_at,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[LlmResponseCache.cache_key],
+        set_={
+            "response": stmt.excluded.response,
+            "expires_at": stmt.excluded.expires_at,
+            "created_at": func.now(),
+        },
+    )
+    with SessionLocal() as session:
+        session.execute(stmt)
+        session.commit()
+
+
+def evict(max_rows: Optional[int] = None) -> int:
+    """Delete expired entries, then the least recently used beyond max_rows. Returns rows deleted."""
+    if max_rows is None:
+        max_rows = int(os.getenv("LLM_CACHE_MAX_ROWS", "50000"))
+    with SessionLocal() as session:
+        deleted = session.execute(
+            delete(LlmResponseCache).where(LlmResponseCache.expires_at <= func.now())
+        ).rowcount
+        overflow = (
+            select(LlmResponseCache.cache_key)
+            .order_by(
+                func.coalesce(
+                    LlmResponseCache.last_hit_at, LlmResponseCache.created_at
+                ).desc()
+            )
+            .offset(max_rows)
+        )
+        deleted += session.execute(
+            delete(LlmResponseCache).where(LlmResponseCache.cache_key.in_(overflow))
+        ).rowcount
+        session.commit()
+    return deleted
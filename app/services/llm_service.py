@@ -1,8 +1,296 @@
 from __future__ import annotations
 
+import hashlib
 import json
+import logging
 import os
-from typing import List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from app.services import llm_cache, metrics
+from app.services.clients import get_genai_client
+
+
+RECOMMENDATIONS = ("buy", "sell", "hold")
+
+FEATURES_SYSTEM_PROMPT = (
+    "Role: You are a concise markets analyst.\n\n"
+    "Task: You receive a pre-computed feature vector for one symbol (trend, momentum, volatility, "
+    "volume vs. average, SMA/EMA/RSI/ATR, and optionally rolling 7/30/90-day returns, volatility, "
+    "average volume and high/low ranges). Return ONLY a compact JSON with exactly these keys:\n"
+    "- recommendation: one of [\"buy\",\"sell\",\"hold\"]\n"
+    "- rationale: short, plain-English reason (<= 50 words), grounded ONLY in the provided features\n\n"
+    "Rules:\n"
+    "- Use only the features; no external data, no speculation, no disclaimers.\n"
+    "- Do not recompute or restate numbers beyond what the rationale needs.\n"
+    "- null features are unavailable; if insufficient_data is true, return recommendation=\"hold\", rationale=\"insufficient_data\".\n"
+    "- Output must be valid JSON, no extra keys, no markdown, no text around it.\n"
+)
+
+# Changes whenever the prompt text changes, so cached answers are never reused across prompts
+FEATURES_PROMPT_VERSION = "features-" + hashlib.sha256(FEATURES_SYSTEM_PROMPT.encode()).hexdigest()[:12]
+
+# Same rules, applied to an array of feature vectors in one request. Batch
+# verdicts share the single-symbol cache namespace (FEATURES_PROMPT_VERSION):
+# the per-symbol rules are identical, only the envelope differs.
+BATCH_SYSTEM_PROMPT = (
+    FEATURES_SYSTEM_PROMPT
+    + "\nBatch mode: the input is a JSON array of {id, features} items, one per symbol. "
+    "Judge each item independently by the rules above and return a JSON array with exactly one "
+    "{id, recommendation, rationale} object per input item, echoing its id.\n"
+)
+
+# Symbols per batched request (LLM_BATCH_SIZE); 1 keeps one request per symbol
+DEFAULT_BATCH_SIZE = 1
+
+logger = logging.getLogger(__name__)
+
+
+def batch_size_from_env() -> int:
+    try:
+        return max(1, int(os.getenv("LLM_BATCH_SIZE", str(DEFAULT_BATCH_SIZE))))
+    except ValueError:
+        return DEFAULT_BATCH_SIZE
+
+
+def _gemini(api_key: str) -> Tuple[Any, Any]:
+    try:
+        from google.genai import types  # type: ignore[import-not-found]
+    except Exception:
+        raise RuntimeError("missing_dependency: install google-genai")
+    return get_genai_client(api_key), types
+
+
+def _generate(
+    client: Any, operation: str, check: Optional[Callable[[Any], None]] = None, **kwargs: Any
+) -> Any:
+    """client.models.generate_content parsed as JSON (and passed to `check`, which raises on bad content).
+
+    Parsing and checking happen inside the metrics block, so malformed answers
+    count as upstream errors (code invalid_llm_response) like failed calls do.
+    """
+    with metrics.observe_upstream("gemini", operation):
+        parsed = _parse_json(client.models.generate_content(**kwargs).text)
+        if check is not None:
+            check(parsed)
+        return parsed
+
+
+def _api_key() -> str:
+    api_key = os.getenv("GOOGLE_API_KEY") or os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        raise RuntimeError(
+            "missing_gemini_api_key: set GOOGLE_API_KEY or GEMINI_API_KEY"
+        )
+    return api_key
+
+
+def _parse_json(text: str) -> Any:
+    if not text:
+        raise RuntimeError("invalid_llm_response: empty")
+    try:
+        return json.loads(text)
+    except Exception as e:
+        raise RuntimeError(f"invalid_llm_response: expected JSON: {e}")
+
+
+def _check_verdict(verdict: Any) -> None:
+    if not isinstance(verdict, dict) or verdict.get("recommendation") not in RECOMMENDATIONS:
+        raise RuntimeError(f"invalid_llm_response: unexpected content: {verdict!r}")
+
+
+def _check_array(payload: Any) -> None:
+    if not isinstance(payload, list):
+        raise RuntimeError("invalid_llm_response: expected a JSON array")
+
+
+def _with_features(verdict: Dict[str, Any], features: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "recommendation": verdict["recommendation"],
+        "rationale": str(verdict.get("rationale") or ""),
+        "change_percent": features.get("change_percent") or 0.0,
+        "window_days": features.get("window_days") or 0,
+    }
+
+
+def _cache_lookup(model: str, features: Dict[str, Any]) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+    if not llm_cache.enabled():
+        return None, None
+    key = llm_cache.cache_key(model, FEATURES_PROMPT_VERSION, features)
+    try:
+        cached = llm_cache.get(key)
+    except Exception:
+        cached = None
+    if isinstance(cached, dict) and cached.get("recommendation") in RECOMMENDATIONS:
+        return key, cached
+    return key, None
+
+
+def analyze_features_with_gemini(
+    features: Dict[str, Any], model: str = "gemini-2.5-flash", use_cache: bool = True
+) -> Dict[str, Any]:
+    """Ask Gemini for a verdict on a pre-computed feature vector (see services.indicators).
+
+    The model only writes recommendation and rationale; change_percent and
+    window_days are taken from the features, so the returned dict has the same
+    shape as analyze_with_gemini's. Verdicts are looked up in / stored to the
+    persistent LLM cache first (LLM_CACHE=0 disables); cache errors never fail
+    the analysis.
+    """
+    key = None
+    if use_cache:
+        key, cached = _cache_lookup(model, features)
+        if cached is not None:
+            return _with_features(cached, features)
+
+    client, types = _gemini(_api_key())
+
+    user_content = (
+        "Features (JSON). Return ONLY the JSON object.\n"
+        f"{json.dumps(features, separators=(',', ':'))}"
+    )
+
+    verdict = _generate(
+        client,
+        "features",
+        check=_check_verdict,
+        model=model,
+        config=types.GenerateContentConfig(
+            system_instruction=FEATURES_SYSTEM_PROMPT,
+            response_mime_type="application/json",
+        ),
+        contents=user_content,
+    )
+
+    if key is not None:
+        try:
+            llm_cache.put(
+                key,
+                model,
+                FEATURES_PROMPT_VERSION,
+                {"recommendation": verdict["recommendation"], "rationale": verdict.get("rationale")},
+            )
+        except Exception:
+            pass
+
+    return _with_features(verdict, features)
+
+
+def _batch_schema(types: Any) -> Any:
+    item = types.Schema(
+        type=types.Type.OBJECT,
+        properties={
+            "id": types.Schema(type=types.Type.INTEGER),
+            "recommendation": types.Schema(type=types.Type.STRING, enum=list(RECOMMENDATIONS)),
+            "rationale": types.Schema(type=types.Type.STRING),
+        },
+        required=["id", "recommendation", "rationale"],
+    )
+    return types.Schema(type=types.Type.ARRAY, items=item)
+
+
+def _generate_batch(
+    model: str, items: List[Dict[str, Any]]
+) -> Dict[int, Dict[str, Any]]:
+    """One Gemini call for items [{id, features}]; returns valid verdicts by id (others omitted)."""
+    client, types = _gemini(_api_key())
+    payload = _generate(
+        client,
+        "features_batch",
+        check=_check_array,
+        model=model,
+        config=types.GenerateContentConfig(
+            system_instruction=BATCH_SYSTEM_PROMPT,
+            response_mime_type="application/json",
+            response_schema=_batch_schema(types),
+        ),
+        contents=(
+            "Items (JSON array). Return ONLY the JSON array.\n"
+            f"{json.dumps(items, separators=(',', ':'))}"
+        ),
+    )
+
+    ids = {item["id"] for item in items}
+    verdicts: Dict[int, Dict[str, Any]] = {}
+    for el in payload:
+        if (
+            isinstance(el, dict)
+            and el.get("id") in ids
+            and el["id"] not in verdicts
+            and el.get("recommendation") in RECOMMENDATIONS
+        ):
+            verdicts[el["id"]] = el
+    return verdicts
+
+
+def analyze_features_batch_with_gemini(
+    features_list: List[Dict[str, Any]],
+    model: str = "gemini-2.5-flash",
+    batch_size: Optional[int] = None,
+    max_workers: int = 1,
+    use_cache: bool = True,
+) -> List[Union[Dict[str, Any], Exception]]:
+    """Verdicts for many feature vectors, packing up to batch_size of them per Gemini request.
+
+    Results are positional (one per input): the same dict shape as
+    analyze_features_with_gemini, or the exception for an item that still
+    failed after being retried on its own. Cached verdicts are reused; items a
+    batch response omitted or got wrong (bad id, invalid recommendation), and
+    every item of a failed request (logged), are retried individually. Batch
+    requests and those retries share one pool, so at most max_workers Gemini
+    requests are in flight at any time.
+    """
+    size = max(1, batch_size or batch_size_from_env())
+    results: List[Union[Dict[str, Any], Exception, None]] = [None] * len(features_list)
+    keys: List[Optional[str]] = [None] * len(features_list)
+
+    pending: List[int] = []
+    for i, features in enumerate(features_list):
+        if use_cache:
+            keys[i], cached = _cache_lookup(model, features)
+            if cached is not None:
+                results[i] = _with_features(cached, features)
+                continue
+        pending.append(i)
+
+    def run_chunk(chunk: List[int]) -> Dict[int, Dict[str, Any]]:
+        try:
+            return _generate_batch(
+                model, [{"id": i, "features": features_list[i]} for i in chunk]
+            )
+        except Exception as e:
+            logger.warning(
+                "gemini batch of %d items failed, retrying them one by one: %s", len(chunk), e
+            )
+            return {}
+
+    def run_single(i: int) -> Union[Dict[str, Any], Exception]:
+        try:
+            return analyze_features_with_gemini(features_list[i], model=model, use_cache=use_cache)
+        except Exception as e:
+            return e
+
+    chunks = [pending[n:n + size] for n in range(0, len(pending), size)]
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        for verdicts in pool.map(run_chunk, chunks):
+            for i, verdict in verdicts.items():
+                results[i] = _with_features(verdict, features_list[i])
+                if keys[i] is not None:
+                    try:
+                        llm_cache.put(
+                            keys[i],
+                            model,
+                            FEATURES_PROMPT_VERSION,
+                            {"recommendation": verdict["recommendation"], "rationale": verdict.get("rationale")},
+                        )
+                    except Exception:
+                        pass
+
+        retry = [i for i in pending if results[i] is None]
+        for i, outcome in zip(retry, pool.map(run_single, retry)):
+            results[i] = outcome
+
+    return results  # type: ignore[return-value]
 
 
 def analyze_with_gemini(
@@ -24,19 +312,7 @@ def analyze_with_gemini(
       "vwap": 115491.02
     }
     """
-    api_key = os.getenv("GOOGLE_API_KEY") or os.getenv("GEMINI_API_KEY")
-    if not api_key:
-        raise RuntimeError(
-            "missing_gemini_api_key: set GOOGLE_API_KEY or GEMINI_API_KEY"
-        )
-
-    try:
-        from google import genai  # type: ignore[import-not-found]
-        from google.genai import types
-    except Exception:
-        raise RuntimeError("missing_dependency: install google-genai")
-
-    client = genai.Client(api_key=api_key)
+    client, types = _gemini(_api_key())
 
     system_prompt = (
         "Role: You are a concise markets analyst.\n\n"
@@ -59,7 +335,9 @@ def analyze_with_gemini(
         f"{json.dumps(data)}"
     )
 
-    resp = client.models.generate_content(
+    return _generate(
+        client,
+        "eod_window",
         model=model,
         config=types.GenerateContentConfig(
             system_instruction=system_prompt,
@@ -67,10 +345,3 @@ def analyze_with_gemini(
         ),
         contents=user_content,
     )
-    text = resp.text
-    if not text:
-        raise RuntimeError("invalid_llm_response: empty")
-    try:
-        return json.loads(text)
-    except Exception as e:
-        raise RuntimeError(f"invalid_llm_response: expected JSON: {e}")
@@ -0,0 +1,283 @@
+"""In-process request/DB/upstream metrics with a Prometheus text exposition.
+
+Counters, gauges and histograms are plain thread-safe objects (the Procfile
+runs one gthread worker, so one process holds every sample). init_app() wires
+Flask request hooks, SQLAlchemy cursor events and GET /metrics; FMP and
+Gemini calls record themselves through observe_upstream(). METRICS_ENABLED=0
+turns everything off.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+
+
+# Upper bounds (seconds) for latency histograms; the last bucket is +Inf
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+def enabled() -> bool:
+    return os.getenv("METRICS_ENABLED", "1").lower() in {"1", "true", "yes", "on"}
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _num(x: float) -> str:
+    return repr(float(x)) if x != int(x) else str(int(x))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return super().render() + [
+            f"{self.name}{_labels(self.labelnames, k)} {_num(v)}" for k, v in items
+        ]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        collect: Optional[Callable[[], Dict[Tuple[str, ...], float]]] = None,
+    ) -> None:
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        # Optional callback producing current values at scrape time
+        self._collect = collect
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def render(self) -> List[str]:
+        if self._collect is not None:
+            try:
+                items = sorted(self._collect().items())
+            except Exception:
+                items = []
+        else:
+            with self._lock:
+                items = sorted(self._values.items())
+        return super().render() + [
+            f"{self.name}{_labels(self.labelnames, k)} {_num(v)}" for k, v in items
+        ]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[Tuple[str, ...], List[Any]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][bisect_left(self.buckets, value)] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, [list(v[0]), v[1], v[2]]) for k, v in self._series.items())
+        lines = super().render()
+        bounds = [_num(b) for b in self.buckets] + ["+Inf"]
+        for labels, (counts, total, count) in items:
+            cumulative = 0
+            for le, c in zip(bounds, counts):
+                cumulative += c
+                le_label = 'le="%s"' % le
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le_label)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_num(round(total, 6))}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+REGISTRY: List[_Metric] = []
+
+
+def render() -> str:
+    return "\n".join(line for m in REGISTRY for line in m.render()) + "\n"
+
+
+# HTTP
+http_requests = Counter(
+    "http_requests_total", "HTTP requests by endpoint and status", ("method", "endpoint", "status")
+)
+http_latency = Histogram(
+    "http_request_duration_seconds", "HTTP request latency (until the response is returned)", ("method", "endpoint")
+)
+http_in_flight = Gauge("http_requests_in_flight", "HTTP requests currently being handled")
+http_db_time = Histogram(
+    "http_request_db_seconds", "Time spent in DB queries per HTTP request", ("endpoint",)
+)
+
+# Database
+db_queries = Histogram("db_query_duration_seconds", "DB statement execution time")
+
+# Upstreams (FMP, Gemini)
+upstream_latency = Histogram(
+    "upstream_request_duration_seconds", "Upstream call latency, per attempt", ("service", "operation")
+)
+upstream_errors = Counter(
+    "upstream_errors_total", "Failed upstream calls by error code", ("service", "operation", "code")
+)
+
+
+def _error_code(e: Exception) -> str:
+    code = getattr(e, "code", None)
+    if code == "upstream_http_error" and getattr(e, "status", None):
+        return f"http_{e.status}"  # type: ignore[attr-defined]
+    if isinstance(code, str) and code:
+        return code
+    # RuntimeError("code: detail") convention
+    prefix = str(e).split(":", 1)[0]
+    return prefix if prefix and " " not in prefix and len(prefix) <= 64 else type(e).__name__
+
+
+@contextmanager
+def observe_upstream(service: str, operation: str) -> Iterator[None]:
+    """Time one upstream call; exceptions are counted by error code and re-raised."""
+    if not enabled():
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        upstream_errors.inc(service, operation, _error_code(e))
+        raise
+    finally:
+        upstream_latency.observe(time.perf_counter() - start, service, operation)
+
+
+# Per-thread DB time of the request being handled (gthread: one request per thread)
+_request_state = threading.local()
+
+
+def _install_db_timing(engine: Any) -> None:
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("metrics_start")
+        if not starts:
+            return
+        elapsed = time.perf_counter() - starts.pop()
+        db_queries.observe(elapsed)
+        if getattr(_request_state, "active", False):
+            _request_state.db_time += elapsed
+
+
+def _pool_gauges() -> Dict[Tuple[str, ...], float]:
+    from app.db import get_pool_status
+
+    status = get_pool_status()
+    return {
+        (k,): float(status[k])
+        for k in ("size", "checked_in", "checked_out", "overflow")
+        if k in status
+    }
+
+
+Gauge("db_pool_connections", "Connection pool occupancy", ("state",), collect=_pool_gauges)
+
+
+def init_app(app: Any) -> None:
+    """Install request hooks, DB timing and the GET /metrics endpoint on a Flask app."""
+    if not enabled():
+        return
+    from flask import Response, g, request
+
+    from app.db import engine
+
+    if not getattr(engine, "_metrics_installed", False):
+        _install_db_timing(engine)
+        engine._metrics_installed = True  # type: ignore[attr-defined]
+
+    @app.before_request
+    def _start_timer() -> None:
+        g.metrics_start = time.perf_counter()
+        _request_state.active = True
+        _request_state.db_time = 0.0
+        http_in_flight.inc()
+
+    @app.after_request
+    def _record(response):
+        start = g.pop("metrics_start", None)
+        if start is not None:
+            # Route pattern, not the raw path, keeps label cardinality bounded
+            endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+            http_latency.observe(time.perf_counter() - start, request.method, endpoint)
+            http_requests.inc(request.method, endpoint, str(response.status_code))
+            http_db_time.observe(getattr(_request_state, "db_time", 0.0), endpoint)
+        return response
+
+    @app.teardown_request
+    def _finish(exc):
+        if getattr(_request_state, "active", False):
+            _request_state.active = False
+            http_in_flight.dec()
+
+    @app.get("/metrics")
+    def metrics_endpoint():
+        return Response(render(), content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,79 @@
+"""Read-through price store: serve EOD history from Postgres, fetching only missing gaps from FMP."""
+from __future__ import annotations
+
+import os
+from datetime import date, timedelta
+from typing import Any, Dict, List, Tuple
+
+from asgiref.sync import sync_to_async
+
+from app.services.fmp_service import fetch_eod_ranges, fetch_eod_ranges_async
+from app.services.repository import (
+    find_missing_ranges,
+    get_eod_range,
+    record_coverage,
+    upsert_eod_many,
+)
+
+
+# More gaps than this are fetched as one spanning request instead of one request each
+MAX_GAP_REQUESTS = int(os.getenv("FMP_MAX_GAP_REQUESTS", "3"))
+
+# Days before today left uncovered (re-checked next time) unless FMP already returned a bar
+# for them or later: the latest bars may not be published yet when a gap is fetched
+SETTLE_DAYS = int(os.getenv("FMP_SETTLE_DAYS", "2"))
+
+
+def _find_gaps(symbol: str, from_date: date, to_date: date) -> List[Tuple[date, date]]:
+    end = min(to_date, date.today())
+    gaps = find_missing_ranges(symbol, from_date, end) if from_date <= end else []
+    if len(gaps) > MAX_GAP_REQUESTS:
+        gaps = [(gaps[0][0], gaps[-1][1])]
+    return gaps
+
+
+def _store_gaps(
+    symbol: str, gaps: List[Tuple[date, date]], fetched_rows: List[List[Dict[str, Any]]]
+) -> None:
+    today = date.today()
+    settled = today - timedelta(days=max(SETTLE_DAYS, 1))
+    for (start, stop), rows in zip(gaps, fetched_rows):
+        upsert_eod_many(symbol, rows)
+        latest = max((date.fromisoformat(r["date"][:10]) for r in rows if r.get("date")), default=None)
+        if latest is not None and latest > settled:
+            covered_to = min(latest, today - timedelta(days=1))
+        else:
+            covered_to = settled
+        record_coverage(symbol, start, min(stop, covered_to))
+
+
+def get_eod_series(
+    symbol: str, from_date: date, to_date: date
+) -> Tuple[List[Dict[str, Any]], List[Tuple[date, date]]]:
+    """Return (rows newest first, ranges fetched upstream) for [from_date, to_date].
+
+    Days already stored or previously fetched (weekends/holidays included) are
+    served locally. Gaps are fetched concurrently, upserted and recorded as
+    covered. Today is never recorded as covered since its bar may still change,
+    and the last FMP_SETTLE_DAYS days only up to the latest bar FMP returned, so
+    bars not yet published are re-requested. Future dates are never requested.
+    """
+    gaps = _find_gaps(symbol, from_date, to_date)
+    if gaps:
+        _store_gaps(symbol, gaps, fetch_eod_ranges(symbol, gaps))
+    return get_eod_range(symbol, from_date, to_date), gaps
+
+
+async def get_eod_series_async(
+    symbol: str, from_date: date, to_date: date
+) -> Tuple[List[Dict[str, Any]], List[Tuple[date, date]]]:
+    """get_eod_series for async views: the FMP fetch is awaited, not waited on in a thread.
+
+    DB steps use asgiref's thread-sensitive sync_to_async, so they run on the
+    request's own thread, where per-request DB timing and profiling apply.
+    """
+    gaps = await sync_to_async(_find_gaps)(symbol, from_date, to_date)
+    if gaps:
+        fetched_rows = await fetch_eod_ranges_async(symbol, gaps)
+        await sync_to_async(_store_gaps)(symbol, gaps, fetched_rows)
+    return await sync_to_async(get_eod_range)(symbol, from_date, to_date), gaps
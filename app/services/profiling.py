@@ -0,0 +1,194 @@
+"""Opt-in profiling of single requests and job stages, written as files for offline analysis.
+
+Two modes (PROFILE_MODE):
+- "sample" (default): a background thread samples the profiled thread's stack
+  every PROFILE_INTERVAL_MS and writes collapsed stacks (`a;b;c 42` lines),
+  the input format of flamegraph.pl, speedscope and inferno.
+- "cprofile": deterministic cProfile of the thread, dumped as a .prof file
+  (pstats / snakeviz). Only one cProfile session runs at a time; overlapping
+  requests are simply not profiled.
+
+Requests are profiled when they send `X-Profile: <PROFILE_TOKEN>` or are picked
+by PROFILE_SAMPLE_RATE (0..1). Jobs profile stages when PROFILE_JOB=1. With
+none of these set, init_app() installs no hooks and stage() returns a shared
+no-op context manager, so the disabled cost is one attribute check.
+"""
+from __future__ import annotations
+
+import hmac
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timezone
+from typing import Any, ContextManager, Iterator, List, Optional
+
+
+PROFILE_HEADER = "X-Profile"
+_NOOP = nullcontext()
+_cprofile_lock = threading.Lock()
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def profile_dir() -> str:
+    return os.getenv("PROFILE_DIR", "profiles")
+
+
+def mode() -> str:
+    return "cprofile" if os.getenv("PROFILE_MODE", "sample").lower() == "cprofile" else "sample"
+
+
+def _frame_label(frame: Any) -> str:
+    code = frame.f_code
+    label = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+    return label.replace(";", ":")
+
+
+class StackSampler:
+    """Samples one thread's Python stack at a fixed interval into collapsed-stack counts."""
+
+    def __init__(self, thread_id: int, interval: float) -> None:
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def start(self) -> "StackSampler":
+        self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack: List[str] = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            if stack:
+                self.counts[";".join(reversed(stack))] += 1
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def write(self, path: str) -> None:
+        with open(path, "w") as f:
+            for stack, count in self.counts.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class Session:
+    """One profiling run of the current thread; write() stores it and returns the file path."""
+
+    def __init__(self, name: str) -> None:
+        self.name = re.sub(r"[^A-Za-z0-9_.-]+", "_", name).strip("_") or "profile"
+        self.mode = mode()
+        self.started = time.perf_counter()
+        self._sampler: Optional[StackSampler] = None
+        self._profiler: Optional[Any] = None
+        self._owns_lock = False
+
+    def start(self) -> bool:
+        """Begin profiling; False if it could not start (a cProfile session is already active)."""
+        if self.mode == "cprofile":
+            if not _cprofile_lock.acquire(blocking=False):
+                return False
+            self._owns_lock = True
+            import cProfile
+
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        else:
+            interval = max(0.001, _env_float("PROFILE_INTERVAL_MS", 5) / 1000.0)
+            self._sampler = StackSampler(threading.get_ident(), interval).start()
+        return True
+
+    def stop(self) -> Optional[str]:
+        elapsed_ms = (time.perf_counter() - self.started) * 1000.0
+        try:
+            if self._profiler is not None:
+                self._profiler.disable()
+            if self._sampler is not None:
+                self._sampler.stop()
+            os.makedirs(profile_dir(), exist_ok=True)
+            stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S.%fZ")
+            ext = "prof" if self._profiler is not None else "collapsed"
+            path = os.path.join(profile_dir(), f"{stamp}-{self.name}-{elapsed_ms:.0f}ms.{ext}")
+            if self._profiler is not None:
+                self._profiler.dump_stats(path)
+            elif self._sampler is not None:
+                self._sampler.write(path)
+            return path
+        finally:
+            if self._owns_lock:
+                self._owns_lock = False
+                _cprofile_lock.release()
+
+
+def job_enabled() -> bool:
+    return os.getenv("PROFILE_JOB", "0").lower() in {"1", "true", "yes", "on"}
+
+
+@contextmanager
+def _stage(name: str) -> Iterator[None]:
+    session = Session(name)
+    started = session.start()
+    try:
+        yield
+    finally:
+        if started:
+            path = session.stop()
+            print(f"Profile: {name} -> {path}", flush=True)
+
+
+def stage(name: str) -> ContextManager[None]:
+    """Profile a block of a batch job when PROFILE_JOB=1; otherwise a no-op."""
+    return _stage(name) if job_enabled() else _NOOP
+
+
+def init_app(app: Any) -> None:
+    """Profile selected requests; installs nothing unless PROFILE_TOKEN or PROFILE_SAMPLE_RATE is set."""
+    token = os.getenv("PROFILE_TOKEN", "")
+    rate = min(1.0, max(0.0, _env_float("PROFILE_SAMPLE_RATE", 0.0)))
+    if not token and rate <= 0.0:
+        return
+    from flask import g, request
+
+    def selected() -> bool:
+        sent = request.headers.get(PROFILE_HEADER)
+        if token and sent and hmac.compare_digest(sent, token):
+            return True
+        return rate > 0.0 and random.random() < rate
+
+    @app.before_request
+    def _start_profile() -> None:
+        if selected():
+            rule = request.url_rule.rule if request.url_rule else "unmatched"
+            session = Session(f"{request.method}-{rule}")
+            if session.start():
+                g.profile_session = session
+
+    @app.after_request
+    def _tag_response(response):
+        if g.get("profile_session") is not None:
+            response.headers["X-Profile-Mode"] = g.profile_session.mode
+        return response
+
+    # Teardown runs after streamed bodies finish, so streaming time is included
+    @app.teardown_request
+    def _stop_profile(exc) -> None:
+        session = g.pop("profile_session", None)
+        if session is not None:
+            path = session.stop()
+            app.logger.info("profile written: %s", path)
@@ -1,47 +1,590 @@
-from datetime import date, timedelta
-from typing import List, Optional
+import threading
+from datetime import date, datetime, timedelta
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
-from sqlalchemy import select, desc
+from sqlalchemy import Float, cast, delete, desc, func, select, text, true, tuple_
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import aliased
 
-from app.db import SessionLocal
-from app.models import EodPrice, DailyRecommendation
+from app.db import SessionLocal, engine
+from app.models import EodPrice, EodFetchCoverage, EodRollingStats, DailyRecommendation
+from app.services import rolling_stats
+from app.services.cache import latest_recommendation_cache
 
 
-def get_last_n_days(symbol: str, n: int) -> List[EodPrice]:
+def last_n_days_query(symbol: str, n: int):
+    """OHLCV projection covered by uq_eod_prices_symbol_date (index-only backward scan)."""
+    return (
+        select(
+            EodPrice.symbol,
+            EodPrice.trade_date,
+            EodPrice.open,
+            EodPrice.high,
+            EodPrice.low,
+            EodPrice.close,
+            EodPrice.volume,
+        )
+        .where(EodPrice.symbol == symbol)
+        .order_by(desc(EodPrice.trade_date))
+        .limit(n)
+    )
+
+
+def get_last_n_days(symbol: str, n: int) -> List[Row]:
+    """Last n bars for symbol, newest first.
+
+    Returns Row tuples with only symbol/trade_date/open/high/low/close/volume
+    (attribute access works as on EodPrice), not EodPrice entities: the
+    projection is what keeps the scan index-only.
+    """
     with SessionLocal() as session:
-        q = (
-            select(EodPrice)
-            .where(EodPrice.symbol == symbol)
-            .order_by(desc(EodPrice.trade_date))
-            .limit(n)
+        return list(session.execute(last_n_days_query(symbol, n)).all())
+
+
+def latest_recommendation_query(symbol: str):
+    """Most recent recommendation for symbol; served by ix_daily_rec_symbol_latest."""
+    return (
+        select(DailyRecommendation)
+        .where(DailyRecommendation.symbol == symbol)
+        .order_by(
+            desc(DailyRecommendation.trade_date), desc(DailyRecommendation.created_at)
         )
-    return list(session.scalars(q).all())
+        .limit(1)
+    )
 
 
-def upsert_eod_from_payload(symbol: str, payload: dict) -> bool:
-    """Insert EOD row if not already present for date. Returns True if inserted, False if existed."""
-    trade_date = date.fromisoformat(payload["date"])  # may raise ValueError
+def latest_recommendations_query(symbols: List[str]):
+    """Most recent recommendation for each of `symbols` in one statement.
+
+    unnest(symbols) CROSS JOIN LATERAL (latest_recommendation_query): one
+    LIMIT 1 probe of ix_daily_rec_symbol_latest per symbol, however long each
+    symbol's history is. Symbols without a recommendation produce no row.
+    """
+    wanted = func.unnest(postgresql.array(symbols)).table_valued("symbol").render_derived("wanted")
+    latest = latest_recommendation_query(wanted.c.symbol).subquery().lateral("latest")
+    return select(aliased(DailyRecommendation, latest)).select_from(wanted).join(latest, true())
+
+
+# Public column names for price range queries -> EodPrice columns. Numerics are
+# cast to double precision in SQL so rows come back as floats, not Decimals.
+PRICE_COLUMNS = {
+    "open": cast(EodPrice.open, Float),
+    "high": cast(EodPrice.high, Float),
+    "low": cast(EodPrice.low, Float),
+    "close": cast(EodPrice.close, Float),
+    "vwap": cast(EodPrice.vwap, Float),
+    "volume": EodPrice.volume,
+    "change": cast(EodPrice.change_abs, Float),
+    "change_percent": cast(EodPrice.change_percent, Float),
+}
+
+
+def build_price_query(
+    symbols: Optional[List[str]],
+    from_date: Optional[date],
+    to_date: Optional[date],
+    columns: List[str],
+):
+    """Core select of (symbol, trade_date, *columns) with optional symbol/date filters, unordered."""
+    q = select(
+        EodPrice.symbol, EodPrice.trade_date, *(PRICE_COLUMNS[c].label(c) for c in columns)
+    )
+    if symbols:
+        q = q.where(EodPrice.symbol.in_(symbols))
+    if from_date is not None:
+        q = q.where(EodPrice.trade_date >= from_date)
+    if to_date is not None:
+        q = q.where(EodPrice.trade_date <= to_date)
+    return q
+
+
+def get_price_page(
+    symbols: Optional[List[str]],
+    from_date: Optional[date],
+    to_date: Optional[date],
+    columns: List[str],
+    after: Optional[Tuple[str, date]] = None,
+    limit: int = 1000,
+) -> List[Tuple]:
+    """Keyset-paginated price rows as plain tuples (symbol, trade_date, *columns).
+
+    Ordered by (symbol, trade_date); pass the last row's (symbol, trade_date)
+    as `after` to get the next page. Unknown column names raise KeyError.
+    """
+    q = build_price_query(symbols, from_date, to_date, columns)
+    if after is not None:
+        q = q.where(tuple_(EodPrice.symbol, EodPrice.trade_date) > tuple_(*after))
+    q = q.order_by(EodPrice.symbol, EodPrice.trade_date).limit(limit)
     with SessionLocal() as session:
-        existing = session.execute(
-            select(EodPrice.id).where(EodPrice.trade_date == trade_date)
-        ).first()
-        if existing:
-            return False
-        row = EodPrice(
-            symbol=symbol,
-            trade_date=trade_date,
-            open=payload.get("open"),
-            high=payload.get("high"),
-            low=payload.get("low"),
-            close=payload.get("close"),
-            vwap=payload.get("adjClose") or payload.get("vwap"),
-            volume=payload.get("volume"),
-            change_abs=payload.get("change") or payload.get("changeOverTime"),
-            change_percent=payload.get("changePercent"),
+        return [tuple(r) for r in session.execute(q)]
+
+
+# Public screener fields; the first six come from the latest recommendation,
+# the rest from the latest eod_rolling_stats row
+SCREENER_FIELDS = (
+    "symbol",
+    "trade_date",
+    "model_name",
+    "recommendation",
+    "change_percent",
+    "created_at",
+    "stats_date",
+    "close",
+    "return_7d",
+    "return_30d",
+    "return_90d",
+    "volatility_7d",
+    "volatility_30d",
+    "volatility_90d",
+    "avg_volume_30d",
+)
+
+
+def screener_query(
+    symbols: Optional[List[str]] = None,
+    recommendations: Optional[List[str]] = None,
+    since: Optional[date] = None,
+    min_change: Optional[float] = None,
+    max_change: Optional[float] = None,
+    sort: str = "symbol",
+    descending: bool = False,
+    limit: int = 100,
+):
+    """Latest recommendation plus latest rolling stats per symbol, for many symbols in one query.
+
+    Recommendations: with `symbols`, one LIMIT 1 probe of
+    ix_daily_rec_symbol_latest per symbol (unnest + LATERAL, as in
+    latest_recommendations_query); without, DISTINCT ON (symbol) in that
+    index's order. Stats: a LEFT JOIN LATERAL probe per result symbol, a
+    backward LIMIT 1 scan of the eod_rolling_stats primary key, so the
+    history table is never sorted. Filters apply to those latest rows.
+    Unknown sort fields raise KeyError.
+    """
+    rec_cols = (
+        DailyRecommendation.symbol,
+        DailyRecommendation.trade_date,
+        DailyRecommendation.model_name,
+        DailyRecommendation.recommendation,
+        cast(DailyRecommendation.change_percent, Float).label("change_percent"),
+        DailyRecommendation.created_at,
+    )
+    rec_order = (desc(DailyRecommendation.trade_date), desc(DailyRecommendation.created_at))
+    if symbols:
+        wanted = func.unnest(postgresql.array(symbols)).table_valued("symbol").render_derived("wanted")
+        latest_rec = (
+            select(*rec_cols)
+            .where(DailyRecommendation.symbol == wanted.c.symbol)
+            .order_by(*rec_order)
+            .limit(1)
+            .subquery()
+            .lateral("latest_rec")
+        )
+        rec_from = wanted.join(latest_rec, true())
+    else:
+        latest_rec = (
+            select(*rec_cols)
+            .distinct(DailyRecommendation.symbol)
+            .order_by(DailyRecommendation.symbol, *rec_order)
+            .subquery("latest_rec")
+        )
+        rec_from = latest_rec
+
+    latest_stats = (
+        select(
+            EodRollingStats.trade_date.label("stats_date"),
+            cast(EodRollingStats.close, Float).label("close"),
+            EodRollingStats.return_7d,
+            EodRollingStats.return_30d,
+            EodRollingStats.return_90d,
+            EodRollingStats.volatility_7d,
+            EodRollingStats.volatility_30d,
+            EodRollingStats.volatility_90d,
+            EodRollingStats.avg_volume_30d,
+        )
+        .where(EodRollingStats.symbol == latest_rec.c.symbol)
+        .order_by(desc(EodRollingStats.trade_date))
+        .limit(1)
+        .subquery()
+        .lateral("latest_stats")
+    )
+
+    cols = {c.name: c for c in latest_rec.c}
+    cols.update({c.name: c for c in latest_stats.c})
+    q = select(*(cols[f].label(f) for f in SCREENER_FIELDS)).select_from(
+        rec_from.outerjoin(latest_stats, true())
+    )
+    if recommendations:
+        q = q.where(latest_rec.c.recommendation.in_(recommendations))
+    if since is not None:
+        q = q.where(latest_rec.c.trade_date >= since)
+    if min_change is not None:
+        q = q.where(latest_rec.c.change_percent >= min_change)
+    if max_change is not None:
+        q = q.where(latest_rec.c.change_percent <= max_change)
+
+    key = cols[sort]
+    order = key.desc().nulls_last() if descending else key.asc().nulls_last()
+    return q.order_by(order, latest_rec.c.symbol).limit(limit)
+
+
+def get_screener(**kwargs: Any) -> List[Dict[str, Any]]:
+    """Run screener_query and return JSON-ready dicts keyed by SCREENER_FIELDS."""
+    with SessionLocal() as session:
+        rows = session.execute(screener_query(**kwargs)).all()
+    return [
+        {
+            f: v.isoformat() if isinstance(v, (date, datetime)) else v
+            for f, v in zip(SCREENER_FIELDS, r)
+        }
+        for r in rows
+    ]
+
+
+def _stream(q, batch_size: int) -> Iterator[Tuple]:
+    # Server-side cursor: only batch_size rows are held in memory at a time
+    with SessionLocal() as session:
+        result = session.execute(
+            q.execution_options(stream_results=True, yield_per=batch_size)
+        )
+        for row in result:
+            yield tuple(row)
+
+
+def iter_price_rows(
+    symbols: Optional[List[str]],
+    from_date: Optional[date],
+    to_date: Optional[date],
+    columns: List[str],
+    batch_size: int = 5000,
+) -> Iterator[Tuple]:
+    """Stream every matching price row (symbol, trade_date, *columns) ordered by (symbol, trade_date)."""
+    q = build_price_query(symbols, from_date, to_date, columns)
+    return _stream(q.order_by(EodPrice.symbol, EodPrice.trade_date), batch_size)
+
+
+RECOMMENDATION_FIELDS = (
+    "id",
+    "symbol",
+    "trade_date",
+    "model_name",
+    "recommendation",
+    "rationale",
+    "change_percent",
+    "window_days",
+    "created_at",
+)
+
+
+def iter_recommendation_rows(
+    symbols: Optional[List[str]],
+    from_date: Optional[date],
+    to_date: Optional[date],
+    batch_size: int = 5000,
+) -> Iterator[Tuple]:
+    """Stream daily recommendations as tuples in RECOMMENDATION_FIELDS order, by (symbol, trade_date)."""
+    cols = [getattr(DailyRecommendation, f) for f in RECOMMENDATION_FIELDS]
+    cols[RECOMMENDATION_FIELDS.index("change_percent")] = cast(
+        DailyRecommendation.change_percent, Float
+    ).label("change_percent")
+    q = select(*cols)
+    if symbols:
+        q = q.where(DailyRecommendation.symbol.in_(symbols))
+    if from_date is not None:
+        q = q.where(DailyRecommendation.trade_date >= from_date)
+    if to_date is not None:
+        q = q.where(DailyRecommendation.trade_date <= to_date)
+    q = q.order_by(
+        DailyRecommendation.symbol, DailyRecommendation.trade_date, DailyRecommendation.id
+    )
+    return _stream(q, batch_size)
+
+
+def _num(x: Any) -> Optional[float]:
+    return float(x) if x is not None else None
+
+
+def get_eod_range(symbol: str, from_date: date, to_date: date) -> List[Dict[str, Any]]:
+    """Stored EOD rows in [from_date, to_date], newest first, shaped like the FMP payload."""
+    q = (
+        select(
+            EodPrice.symbol,
+            EodPrice.trade_date,
+            EodPrice.open,
+            EodPrice.high,
+            EodPrice.low,
+            EodPrice.close,
+            EodPrice.volume,
+            EodPrice.change_abs,
+            EodPrice.change_percent,
+            EodPrice.vwap,
         )
-        session.add(row)
+        .where(
+            (EodPrice.symbol == symbol)
+            & (EodPrice.trade_date >= from_date)
+            & (EodPrice.trade_date <= to_date)
+        )
+        .order_by(desc(EodPrice.trade_date))
+    )
+    with SessionLocal() as session:
+        return [
+            {
+                "symbol": r.symbol,
+                "date": r.trade_date.isoformat(),
+                "open": _num(r.open),
+                "high": _num(r.high),
+                "low": _num(r.low),
+                "close": _num(r.close),
+                "volume": r.volume,
+                "change": _num(r.change_abs),
+                "changePercent": _num(r.change_percent),
+                "vwap": _num(r.vwap),
+            }
+            for r in session.execute(q)
+        ]
+
+
+def find_missing_ranges(symbol: str, from_date: date, to_date: date) -> List[Tuple[date, date]]:
+    """Contiguous date runs in [from_date, to_date] with neither a stored row nor recorded fetch coverage."""
+    with SessionLocal() as session:
+        covered = set(
+            session.scalars(
+                select(EodPrice.trade_date).where(
+                    (EodPrice.symbol == symbol)
+                    & (EodPrice.trade_date >= from_date)
+                    & (EodPrice.trade_date <= to_date)
+                )
+            )
+        )
+        spans = session.execute(
+            select(EodFetchCoverage.from_date, EodFetchCoverage.to_date).where(
+                (EodFetchCoverage.symbol == symbol)
+                & (EodFetchCoverage.to_date >= from_date)
+                & (EodFetchCoverage.from_date <= to_date)
+            )
+        ).all()
+
+    def is_covered(d: date) -> bool:
+        return d in covered or any(lo <= d <= hi for lo, hi in spans)
+
+    gaps: List[Tuple[date, date]] = []
+    day, one = from_date, timedelta(days=1)
+    while day <= to_date:
+        if not is_covered(day):
+            start = day
+            while day + one <= to_date and not is_covered(day + one):
+                day += one
+            gaps.append((start, day))
+        day += one
+    return gaps
+
+
+def record_coverage(symbol: str, from_date: date, to_date: date) -> None:
+    """Mark [from_date, to_date] as fetched, merging with overlapping or adjacent ranges."""
+    if from_date > to_date:
+        return
+    one = timedelta(days=1)
+    with SessionLocal() as session:
+        touching = session.execute(
+            select(EodFetchCoverage.id, EodFetchCoverage.from_date, EodFetchCoverage.to_date).where(
+                (EodFetchCoverage.symbol == symbol)
+                & (EodFetchCoverage.to_date >= from_date - one)
+                & (EodFetchCoverage.from_date <= to_date + one)
+            )
+        ).all()
+        lo = min([from_date] + [r.from_date for r in touching])
+        hi = max([to_date] + [r.to_date for r in touching])
+        if touching:
+            session.execute(
+                delete(EodFetchCoverage).where(
+                    EodFetchCoverage.id.in_([r.id for r in touching])
+                )
+            )
+        session.add(EodFetchCoverage(symbol=symbol, from_date=lo, to_date=hi))
+        session.commit()
+
+
+_partition_lock = threading.Lock()
+_known_partitions: Set[int] = set()
+
+
+def eod_partition_name(year: int) -> str:
+    return f"eod_prices_y{year:04d}"
+
+
+def ensure_eod_partitions(years: Iterable[int]) -> None:
+    """Create yearly eod_prices partitions for the given years if missing.
+
+    Known years are remembered per process, so steady-state inserts cost nothing
+    extra. No-op on non-Postgres databases.
+    """
+    missing = sorted({int(y) for y in years} - _known_partitions)
+    if not missing or engine.dialect.name != "postgresql":
+        return
+    with _partition_lock:
+        for year in missing:
+            if year in _known_partitions:
+                continue
+            ddl = text(
+                f"CREATE TABLE IF NOT EXISTS {eod_partition_name(year)} PARTITION OF eod_prices "
+                f"FOR VALUES FROM ('{year:04d}-01-01') TO ('{year + 1:04d}-01-01')"
+            )
+            try:
+                with engine.begin() as conn:
+                    conn.execute(ddl)
+            except Exception:
+                # Another process may have created it concurrently; anything else re-raises
+                with engine.begin() as conn:
+                    if not conn.execute(
+                        text("SELECT to_regclass(:name)"), {"name": eod_partition_name(year)}
+                    ).scalar():
+                        raise
+            _known_partitions.add(year)
+
+
+def list_eod_partitions() -> List[str]:
+    """Names of partitions currently attached to eod_prices."""
+    with engine.connect() as conn:
+        return list(
+            conn.execute(
+                text(
+                    "SELECT c.relname FROM pg_inherits i "
+                    "JOIN pg_class c ON c.oid = i.inhrelid "
+                    "WHERE i.inhparent = 'eod_prices'::regclass ORDER BY c.relname"
+                )
+            ).scalars()
+        )
+
+
+def detach_eod_partition(year: int) -> str:
+    """Detach a yearly partition (kept as a standalone table for archiving). Returns its name."""
+    name = eod_partition_name(year)
+    # DETACH ... CONCURRENTLY cannot run inside a transaction block
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text(f"ALTER TABLE eod_prices DETACH PARTITION {name} CONCURRENTLY"))
+    _known_partitions.discard(year)
+    return name
+
+
+def _eod_values(symbol: str, payload: dict) -> dict:
+    """Map an FMP EOD object onto EodPrice column values."""
+    return {
+        "symbol": symbol,
+        "trade_date": date.fromisoformat(payload["date"]),  # may raise ValueError
+        "open": payload.get("open"),
+        "high": payload.get("high"),
+        "low": payload.get("low"),
+        "close": payload.get("close"),
+        "vwap": payload.get("adjClose") or payload.get("vwap"),
+        "volume": payload.get("volume"),
+        "change_abs": payload.get("change") or payload.get("changeOverTime"),
+        "change_percent": payload.get("changePercent"),
+    }
+
+
+# Columns refreshed when an incoming bar conflicts on (symbol, trade_date)
+_EOD_UPDATE_COLUMNS = (
+    "open",
+    "high",
+    "low",
+    "close",
+    "vwap",
+    "volume",
+    "change_abs",
+    "change_percent",
+)
+
+
+def upsert_eod_from_payload(symbol: str, payload: dict) -> bool:
+    """Insert EOD row if not already present for (symbol, date). Returns True if inserted, False if existed.
+    A new bar also refreshes its rolling statistics in the same transaction.
+    """
+    values = _eod_values(symbol, payload)
+    stmt = (
+        pg_insert(EodPrice)
+        .values(**values)
+        .on_conflict_do_nothing(index_elements=["symbol", "trade_date"])
+        .returning(EodPrice.id)
+    )
+    ensure_eod_partitions([values["trade_date"].year])
+    with SessionLocal() as session:
+        inserted = session.execute(stmt).first() is not None
+        if inserted:
+            rolling_stats.refresh_tail(session, symbol, values["trade_date"])
+        session.commit()
+        return inserted
+
+
+def upsert_eod_many(
+    symbol: str, payloads: Iterable[dict], batch_size: int = 1000
+) -> Tuple[int, int]:
+    """Bulk upsert EOD rows for a symbol with one INSERT ... ON CONFLICT per batch.
+
+    Payloads are parsed up front so every yearly partition they need is created
+    before the transaction opens: CREATE ... PARTITION OF needs ACCESS EXCLUSIVE
+    on eod_prices, which would wait forever on this session's own ROW EXCLUSIVE
+    lock if issued mid-transaction from another connection. Rows are then
+    written in batches of batch_size. Rows that conflict on
+    (symbol, trade_date) are updated only when a value actually changed, so
+    re-ingesting an unchanged window writes nothing. All batches share a single
+    transaction, together with a rolling-statistics refresh from the earliest
+    written date onward. Returns (inserted, updated) counts.
+
+    Inserted vs. updated is told apart by a sibling CTE that reads the batch's
+    existing keys from the same snapshot (xmax is not reliable through
+    partitioned-table RETURNING), so each batch is still one statement.
+    """
+    inserted = updated = 0
+    earliest: Optional[date] = None
+    values = [_eod_values(symbol, p) for p in payloads]
+    ensure_eod_partitions({v["trade_date"].year for v in values})
+    it = iter(values)
+    with SessionLocal() as session:
+        while True:
+            batch = list(islice(it, batch_size))
+            if not batch:
+                break
+            # ON CONFLICT cannot touch the same row twice in one statement: last one wins
+            rows = list({v["trade_date"]: v for v in batch}.values())
+            dates = [v["trade_date"] for v in rows]
+
+            existing = (
+                select(EodPrice.trade_date)
+                .where((EodPrice.symbol == symbol) & (EodPrice.trade_date.in_(dates)))
+                .cte("existing")
+            )
+            stmt = pg_insert(EodPrice).values(rows)
+            excluded = stmt.excluded
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["symbol", "trade_date"],
+                set_={
+                    **{c: getattr(excluded, c) for c in _EOD_UPDATE_COLUMNS},
+                    "ingested_at": func.now(),
+                },
+                where=tuple_(
+                    *(getattr(EodPrice, c) for c in _EOD_UPDATE_COLUMNS)
+                ).is_distinct_from(
+                    tuple_(*(getattr(excluded, c) for c in _EOD_UPDATE_COLUMNS))
+                ),
+            ).returning(EodPrice.trade_date)
+            written = stmt.cte("written")
+            q = select(
+                written.c.trade_date,
+                written.c.trade_date.in_(select(existing.c.trade_date)).label("existed"),
+            )
+            for trade_date, existed in session.execute(q):
+                if existed:
+                    updated += 1
+                else:
+                    inserted += 1
+                if earliest is None or trade_date < earliest:
+                    earliest = trade_date
+        if earliest is not None:
+            rolling_stats.refresh_tail(session, symbol, earliest)
         session.commit()
-        return True
+    return inserted, updated
 
 
 def save_daily_recommendation(symbol: str, trade_date: date, model_name: str, content: dict) -> bool:
@@ -67,4 +610,6 @@ def save_daily_recommendation(symbol: str, trade_date: date, model_name: str, co
         )
         session.add(rec)
         session.commit()
-        return True
+    # Only this process's cache; web workers pick the row up within RECS_CACHE_TTL
+    latest_recommendation_cache.invalidate(symbol)
+    return True
@@ -0,0 +1,131 @@
+"""Rolling 7/30/90-bar statistics materialized into eod_rolling_stats.
+
+refresh_tail() recomputes only rows on or after `since`, reading just enough
+earlier bars (the longest window) to fill their windows, in one
+INSERT ... SELECT with window functions. Ingest calls it inside the same
+transaction as the price upsert, so the daily insert of one bar touches ~90
+index entries instead of the whole history.
+"""
+from __future__ import annotations
+
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import Float, case, cast, desc, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.db import SessionLocal
+from app.models import EodPrice, EodRollingStats
+
+
+WINDOWS = (7, 30, 90)
+STAT_PREFIXES = ("return", "volatility", "avg_volume", "high", "low")
+
+
+def _stats_select(symbol: Optional[str], since: Optional[date]):
+    """SELECT producing eod_rolling_stats rows for one symbol (or all) from `since` on."""
+    close_f = cast(EodPrice.close, Float)
+    prev_close = func.lag(close_f).over(partition_by=EodPrice.symbol, order_by=EodPrice.trade_date)
+    src = select(
+        EodPrice.symbol,
+        EodPrice.trade_date,
+        EodPrice.close,
+        close_f.label("close_f"),
+        EodPrice.high,
+        EodPrice.low,
+        EodPrice.volume,
+        (close_f / func.nullif(prev_close, 0.0, type_=Float) - 1).label("daily_return"),
+    )
+    if symbol is not None:
+        src = src.where(EodPrice.symbol == symbol)
+        if since is not None:
+            # Trade date of the (longest window - 1)th bar before `since`; NULL if fewer exist
+            lower = (
+                select(EodPrice.trade_date)
+                .where((EodPrice.symbol == symbol) & (EodPrice.trade_date < since))
+                .order_by(desc(EodPrice.trade_date))
+                .offset(max(WINDOWS) - 2)
+                .limit(1)
+                .scalar_subquery()
+            )
+            src = src.where(EodPrice.trade_date >= func.coalesce(lower, date.min))
+    b = src.subquery("b")
+
+    def over(fn, w: int, rows_back: Optional[int] = None):
+        return fn.over(
+            partition_by=b.c.symbol,
+            order_by=b.c.trade_date,
+            rows=(-(w - 1 if rows_back is None else rows_back), 0),
+        )
+
+    cols: List[Any] = [b.c.symbol, b.c.trade_date, b.c.close]
+    for w in WINDOWS:
+        full = over(func.count(), w) >= w
+
+        def only_full(expr):
+            return case((full, expr), else_=None)
+
+        cols += [
+            only_full(
+                b.c.close_f / func.nullif(over(func.first_value(b.c.close_f), w), 0.0, type_=Float) - 1
+            ).label(f"return_{w}d"),
+            # w bars hold w - 1 close-to-close returns
+            only_full(over(func.stddev_samp(b.c.daily_return), w, w - 2)).label(f"volatility_{w}d"),
+            only_full(cast(over(func.avg(b.c.volume), w), Float)).label(f"avg_volume_{w}d"),
+            only_full(over(func.max(b.c.high), w)).label(f"high_{w}d"),
+            only_full(over(func.min(b.c.low), w)).label(f"low_{w}d"),
+        ]
+    stats = select(*cols).subquery("stats")
+    q = select(*stats.c)
+    if since is not None:
+        q = q.where(stats.c.trade_date >= since)
+    return q
+
+
+def refresh_tail(session: Session, symbol: Optional[str], since: Optional[date]) -> int:
+    """Upsert stats rows on or after `since` (all rows if None) within the caller's transaction.
+
+    symbol=None rebuilds every symbol. Returns the number of rows written.
+    """
+    q = _stats_select(symbol, since)
+    names = [c.name for c in q.selected_columns]
+    stmt = pg_insert(EodRollingStats).from_select(names, q)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["symbol", "trade_date"],
+        set_={
+            **{n: getattr(stmt.excluded, n) for n in names if n not in ("symbol", "trade_date")},
+            "updated_at": func.now(),
+        },
+    )
+    return session.execute(stmt).rowcount or 0
+
+
+def rebuild(symbols: Optional[Iterable[str]] = None) -> int:
+    """Recompute the full history for the given symbols (every symbol if None)."""
+    written = 0
+    with SessionLocal() as session:
+        for symbol in symbols or [None]:
+            written += refresh_tail(session, symbol, None)
+        session.commit()
+    return written
+
+
+def _row_dict(row: Any) -> Dict[str, Any]:
+    out: Dict[str, Any] = {"symbol": row.symbol, "date": row.trade_date.isoformat(), "close": float(row.close)}
+    for w in WINDOWS:
+        for p in STAT_PREFIXES:
+            v = getattr(row, f"{p}_{w}d")
+            out[f"{p}_{w}d"] = float(v) if v is not None else None
+    return out
+
+
+def get_rolling_stats(symbol: str, as_of: Optional[date] = None) -> Optional[Dict[str, Any]]:
+    """Stats for `symbol` on `as_of` (latest stored day if None), or None. One primary-key lookup."""
+    q = select(EodRollingStats).where(EodRollingStats.symbol == symbol)
+    if as_of is not None:
+        q = q.where(EodRollingStats.trade_date == as_of)
+    q = q.order_by(desc(EodRollingStats.trade_date)).limit(1)
+    with SessionLocal() as session:
+        row = session.execute(q).scalars().first()
+        return _row_dict(row) if row is not None else None
@@ -0,0 +1,19 @@
+"""ASGI entrypoint: `uvicorn asgi:app`.
+
+The Flask app runs under asgiref's WsgiToAsgi. asgiref runs WSGI calls on one
+shared thread by default; a ThreadSensitiveContext per request gives each
+request its own thread instead, so a request waiting on FMP does not hold up the
+rest. Cap concurrent requests (and so threads) with uvicorn's --limit-concurrency.
+"""
+from asgiref.sync import ThreadSensitiveContext
+from asgiref.wsgi import WsgiToAsgi
+
+from app import create_app
+
+
+flask_app = WsgiToAsgi(create_app())
+
+
+async def app(scope, receive, send):
+    async with ThreadSensitiveContext():
+        await flask_app(scope, receive, send)
@@ -0,0 +1 @@
+"""Benchmark suite (python -m benchmarks.run); see benchmarks/run.py."""
@@ -0,0 +1,119 @@
+"""In-process stand-ins for FMP and Gemini so benchmarks measure our code, not the network.
+
+Both are deterministic for a given symbol/date/input and can simulate a fixed
+upstream latency.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import time
+from datetime import date, timedelta
+from types import SimpleNamespace
+from typing import Any, Dict
+
+from app.services import fmp_client, llm_service
+
+
+def _unit(*parts: Any) -> float:
+    """Deterministic pseudo-random number in [0, 1) from the parts."""
+    digest = hashlib.blake2b("|".join(map(str, parts)).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big") / 2**64
+
+
+def synthetic_bar(symbol: str, day: date) -> Dict[str, Any]:
+    """FMP-shaped EOD row; prices drift around a per-symbol base."""
+    base = 10 + 990 * _unit(symbol)
+    close = base * (0.8 + 0.4 * _unit(symbol, day.toordinal()))
+    open_ = close * (0.98 + 0.04 * _unit(symbol, day.toordinal(), "o"))
+    high = max(open_, close) * (1 + 0.02 * _unit(symbol, day.toordinal(), "h"))
+    low = min(open_, close) * (1 - 0.02 * _unit(symbol, day.toordinal(), "l"))
+    return {
+        "symbol": symbol,
+        "date": day.isoformat(),
+        "open": round(open_, 4),
+        "high": round(high, 4),
+        "low": round(low, 4),
+        "close": round(close, 4),
+        "volume": int(1e5 + 1e7 * _unit(symbol, day.toordinal(), "v")),
+        "vwap": round((high + low + close) / 3, 4),
+        "change": round(close - open_, 4),
+        "changePercent": round((close - open_) / open_ * 100, 6),
+    }
+
+
+class FakeFmpClient:
+    """Drop-in for AsyncFmpClient.historical_eod (newest first, like FMP)."""
+
+    def __init__(self, latency_ms: float = 0.0) -> None:
+        self.latency = latency_ms / 1000.0
+        self.calls = 0
+
+    async def historical_eod(self, symbol: str, from_date: date, to_date: date) -> list:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        days = (to_date - from_date).days
+        return [synthetic_bar(symbol, to_date - timedelta(days=i)) for i in range(days + 1)]
+
+    async def aclose(self) -> None:
+        pass
+
+
+class _FakeTypes:
+    """Just enough of google.genai.types for llm_service."""
+
+    class Type:
+        OBJECT = "OBJECT"
+        ARRAY = "ARRAY"
+        STRING = "STRING"
+        INTEGER = "INTEGER"
+
+    class Schema(SimpleNamespace):
+        pass
+
+    class GenerateContentConfig(SimpleNamespace):
+        pass
+
+
+class _FakeModels:
+    def __init__(self, latency_ms: float) -> None:
+        self.latency = latency_ms / 1000.0
+        self.calls = 0
+
+    def _verdict(self, features: Dict[str, Any]) -> Dict[str, str]:
+        change = features.get("change_percent") or 0.0
+        rec = "buy" if change > 0.01 else "sell" if change < -0.01 else "hold"
+        return {"recommendation": rec, "rationale": f"synthetic: change {change:+.4f}"}
+
+    def generate_content(self, model: str, config: Any, contents: str) -> Any:
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        payload = json.loads(contents.split("\n", 1)[1])
+        if isinstance(payload, list):
+            out: Any = [{"id": item["id"], **self._verdict(item["features"])} for item in payload]
+        else:
+            out = self._verdict(payload)
+        return SimpleNamespace(text=json.dumps(out))
+
+
+class FakeGenaiClient:
+    def __init__(self, latency_ms: float = 0.0) -> None:
+        self.models = _FakeModels(latency_ms)
+
+
+def install(fmp_latency_ms: float = 0.0, llm_latency_ms: float = 0.0) -> Dict[str, Any]:
+    """Route the shared FMP client and Gemini calls to the fakes. Returns the fake instances."""
+    fmp = FakeFmpClient(fmp_latency_ms)
+    genai = FakeGenaiClient(llm_latency_ms)
+    fmp_client._client = fmp  # type: ignore[assignment]
+    llm_service._gemini = lambda api_key: (genai, _FakeTypes)  # type: ignore[assignment]
+    llm_service._api_key = lambda: "benchmark"  # type: ignore[assignment]
+    return {"fmp": fmp, "genai": genai}
+
+
+def calls(fakes: Dict[str, Any]) -> Dict[str, int]:
+    return {"fmp": fakes["fmp"].calls, "gemini": fakes["genai"].models.calls}
+
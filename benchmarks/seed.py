@@ -0,0 +1,108 @@
+"""Synthetic benchmark dataset: random-walk eod_prices and daily_recommendations via COPY."""
+from __future__ import annotations
+
+import random
+from datetime import date, timedelta
+from typing import Dict, List
+
+from sqlalchemy import text
+
+from app.db import engine
+from app.models import Base
+from app.services import rolling_stats
+from app.services.repository import ensure_eod_partitions
+
+
+TABLES = (
+    "eod_prices",
+    "eod_rolling_stats",
+    "eod_fetch_coverage",
+    "daily_recommendations",
+    "llm_response_cache",
+)
+
+
+def symbol_names(n: int) -> List[str]:
+    return [f"S{i:05d}" for i in range(n)]
+
+
+def _price_rows(symbols: List[str], start: date, days: int, rng: random.Random):
+    for symbol in symbols:
+        close = rng.uniform(10, 1000)
+        for d in range(days):
+            open_ = close
+            close = max(0.01, close * (1 + rng.gauss(0, 0.02)))
+            high = max(open_, close) * (1 + abs(rng.gauss(0, 0.005)))
+            low = min(open_, close) * (1 - abs(rng.gauss(0, 0.005)))
+            yield (
+                symbol,
+                start + timedelta(days=d),
+                round(open_, 6),
+                round(high, 6),
+                round(low, 6),
+                round(close, 6),
+                round((high + low + close) / 3, 6),
+                rng.randint(10_000, 50_000_000),
+                round(close - open_, 6),
+                round((close - open_) / open_, 10),
+            )
+
+
+def _rec_rows(symbols: List[str], end: date, days: int, rng: random.Random):
+    for symbol in symbols:
+        for d in range(days):
+            yield (
+                symbol,
+                end - timedelta(days=d),
+                "benchmark",
+                rng.choice(("buy", "sell", "hold")),
+                "synthetic",
+                round(rng.gauss(0, 0.05), 10),
+                7,
+            )
+
+
+def _copy(table: str, columns: str, rows) -> None:
+    with engine.connect() as conn:
+        dbapi_conn = conn.connection.driver_connection
+        with dbapi_conn.cursor() as cur:
+            with cur.copy(f"COPY {table} ({columns}) FROM STDIN") as copy:
+                for row in rows:
+                    copy.write_row(row)
+        dbapi_conn.commit()
+
+
+def seed(n_symbols: int, days: int, rec_days: int = 30, seed: int = 42) -> Dict[str, int]:
+    """Recreate the benchmark dataset, ending yesterday. Destroys existing rows in TABLES."""
+    rng = random.Random(seed)
+    symbols = symbol_names(n_symbols)
+    end = date.today() - timedelta(days=1)
+    start = end - timedelta(days=days - 1)
+
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(text(f"TRUNCATE {', '.join(TABLES)}"))
+    ensure_eod_partitions(range(start.year, date.today().year + 2))
+
+    _copy(
+        "eod_prices",
+        "symbol, trade_date, open, high, low, close, vwap, volume, change_abs, change_percent",
+        _price_rows(symbols, start, days, rng),
+    )
+    _copy(
+        "daily_recommendations",
+        "symbol, trade_date, model_name, recommendation, rationale, change_percent, window_days",
+        _rec_rows(symbols, end, min(rec_days, days), rng),
+    )
+    stats = rolling_stats.rebuild()
+    # VACUUM sets the visibility map so index-only scans behave as in a settled database
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for table in TABLES:
+            conn.execute(text(f"VACUUM (ANALYZE) {table}"))
+    return {
+        "symbols": n_symbols,
+        "days": days,
+        "eod_prices": n_symbols * days,
+        "daily_recommendations": n_symbols * min(rec_days, days),
+        "eod_rolling_stats": stats,
+    }
@@ -0,0 +1,13 @@
+"""Gunicorn settings picked up automatically from the working directory.
+
+The Procfile runs with --preload: the app is imported once in the master and
+workers are forked from it, so a worker recycled by --max-requests starts
+without re-importing Flask, SQLAlchemy and the routes.
+"""
+
+
+def post_fork(server, worker):
+    # Never share pooled DB connections opened in the master (if any) with a worker
+    from app.db import engine
+
+    engine.dispose(close=False)
@@ -0,0 +1,35 @@
+"""create eod_fetch_coverage
+
+Revision ID: a6c2f9d1e7b3
+Revises: d4e8a7c3b5f1
+Create Date: 2025-09-21
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a6c2f9d1e7b3'
+down_revision = 'd4e8a7c3b5f1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'eod_fetch_coverage',
+        sa.Column('id', sa.BigInteger(), primary_key=True, autoincrement=True),
+        sa.Column('symbol', sa.String(), nullable=False),
+        sa.Column('from_date', sa.Date(), nullable=False),
+        sa.Column('to_date', sa.Date(), nullable=False),
+        sa.Column('fetched_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    )
+    op.create_index(
+        'ix_eod_fetch_coverage_symbol_to_date', 'eod_fetch_coverage', ['symbol', 'to_date']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_eod_fetch_coverage_symbol_to_date', table_name='eod_fetch_coverage')
+    op.drop_table('eod_fetch_coverage')
@@ -0,0 +1,122 @@
+"""range-partition eod_prices by trade_date (yearly partitions)
+
+Revision ID: b8d3e5f7a9c2
+Revises: f3b7c1d9a2e4
+Create Date: 2025-09-24
+
+Postgres cannot convert a table in place, so the existing table is renamed,
+a partitioned eod_prices is created with the same columns, one partition per
+year of existing data (plus the current and next year) is created, rows are
+copied over and the old table is dropped. The primary key becomes
+(id, trade_date) because a partitioned table's unique constraints must include
+the partition key; uq_eod_prices_symbol_date already does. Further partitions
+are created on demand by app.services.repository.ensure_eod_partitions or
+scripts/manage_partitions.py.
+
+"""
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b8d3e5f7a9c2'
+down_revision = 'f3b7c1d9a2e4'
+branch_labels = None
+depends_on = None
+
+
+COLUMNS = """
+    id BIGINT NOT NULL DEFAULT nextval('eod_prices_id_seq'),
+    symbol VARCHAR NOT NULL,
+    trade_date DATE NOT NULL,
+    open NUMERIC(20, 8) NOT NULL,
+    high NUMERIC(20, 8) NOT NULL,
+    low NUMERIC(20, 8) NOT NULL,
+    close NUMERIC(20, 8) NOT NULL,
+    vwap NUMERIC(20, 8),
+    volume BIGINT,
+    change_abs NUMERIC(20, 8),
+    change_percent NUMERIC(14, 12),
+    ingested_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now()
+"""
+
+COLUMN_NAMES = (
+    "id, symbol, trade_date, open, high, low, close, vwap, volume, "
+    "change_abs, change_percent, ingested_at"
+)
+
+
+def _year_range(conn) -> range:
+    lo, hi = conn.execute(
+        sa.text("SELECT min(trade_date), max(trade_date) FROM eod_prices_legacy")
+    ).one()
+    this_year = date.today().year
+    first = min(lo.year, this_year) if lo else this_year
+    last = max(hi.year, this_year + 1) if hi else this_year + 1
+    return range(first, last + 1)
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+
+    op.execute("ALTER TABLE eod_prices RENAME TO eod_prices_legacy")
+    op.execute(
+        "ALTER TABLE eod_prices_legacy RENAME CONSTRAINT uq_eod_prices_symbol_date "
+        "TO uq_eod_prices_legacy_symbol_date"
+    )
+    op.execute("ALTER TABLE eod_prices_legacy RENAME CONSTRAINT eod_prices_pkey TO eod_prices_legacy_pkey")
+
+    op.execute(
+        f"""
+        CREATE TABLE eod_prices ({COLUMNS},
+            CONSTRAINT eod_prices_pkey PRIMARY KEY (id, trade_date),
+            CONSTRAINT uq_eod_prices_symbol_date UNIQUE (symbol, trade_date)
+                INCLUDE (open, high, low, close, volume)
+        ) PARTITION BY RANGE (trade_date)
+        """
+    )
+    # Keep the sequence when the legacy table (its current owner) is dropped
+    op.execute("ALTER SEQUENCE eod_prices_id_seq OWNED BY eod_prices.id")
+
+    for year in _year_range(conn):
+        op.execute(
+            f"CREATE TABLE eod_prices_y{year:04d} PARTITION OF eod_prices "
+            f"FOR VALUES FROM ('{year:04d}-01-01') TO ('{year + 1:04d}-01-01')"
+        )
+
+    op.execute(
+        f"INSERT INTO eod_prices ({COLUMN_NAMES}) SELECT {COLUMN_NAMES} FROM eod_prices_legacy"
+    )
+    op.execute("DROP TABLE eod_prices_legacy")
+    op.execute("ANALYZE eod_prices")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE eod_prices RENAME TO eod_prices_partitioned")
+    op.execute(
+        "ALTER TABLE eod_prices_partitioned RENAME CONSTRAINT uq_eod_prices_symbol_date "
+        "TO uq_eod_prices_partitioned_symbol_date"
+    )
+    op.execute(
+        "ALTER TABLE eod_prices_partitioned RENAME CONSTRAINT eod_prices_pkey "
+        "TO eod_prices_partitioned_pkey"
+    )
+
+    op.execute(
+        f"""
+        CREATE TABLE eod_prices ({COLUMNS},
+            CONSTRAINT eod_prices_pkey PRIMARY KEY (id),
+            CONSTRAINT uq_eod_prices_symbol_date UNIQUE (symbol, trade_date)
+                INCLUDE (open, high, low, close, volume)
+        )
+        """
+    )
+    op.execute("ALTER SEQUENCE eod_prices_id_seq OWNED BY eod_prices.id")
+    op.execute(
+        f"INSERT INTO eod_prices ({COLUMN_NAMES}) SELECT {COLUMN_NAMES} FROM eod_prices_partitioned"
+    )
+    # Dropping the parent drops every attached partition
+    op.execute("DROP TABLE eod_prices_partitioned")
+    op.execute("ANALYZE eod_prices")
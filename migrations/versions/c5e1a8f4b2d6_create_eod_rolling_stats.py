@@ -0,0 +1,46 @@
+"""create eod_rolling_stats
+
+Revision ID: c5e1a8f4b2d6
+Revises: b8d3e5f7a9c2
+Create Date: 2025-09-25
+
+Populate existing history afterwards with scripts/refresh_rolling_stats.py;
+new bars are maintained incrementally on ingest.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5e1a8f4b2d6'
+down_revision = 'b8d3e5f7a9c2'
+branch_labels = None
+depends_on = None
+
+
+WINDOWS = (7, 30, 90)
+
+
+def upgrade() -> None:
+    columns = []
+    for w in WINDOWS:
+        columns += [
+            sa.Column(f'return_{w}d', sa.Float(), nullable=True),
+            sa.Column(f'volatility_{w}d', sa.Float(), nullable=True),
+            sa.Column(f'avg_volume_{w}d', sa.Float(), nullable=True),
+            sa.Column(f'high_{w}d', sa.Numeric(20, 8), nullable=True),
+            sa.Column(f'low_{w}d', sa.Numeric(20, 8), nullable=True),
+        ]
+    op.create_table(
+        'eod_rolling_stats',
+        sa.Column('symbol', sa.String(), primary_key=True),
+        sa.Column('trade_date', sa.Date(), primary_key=True),
+        sa.Column('close', sa.Numeric(20, 8), nullable=False),
+        *columns,
+        sa.Column('updated_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('eod_rolling_stats')
@@ -0,0 +1,36 @@
+"""create llm_response_cache
+
+Revision ID: d4e8a7c3b5f1
+Revises: bf4b8a1d3f0a
+Create Date: 2025-09-20
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4e8a7c3b5f1'
+down_revision = 'bf4b8a1d3f0a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'llm_response_cache',
+        sa.Column('cache_key', sa.String(64), primary_key=True),
+        sa.Column('model_name', sa.String(), nullable=False),
+        sa.Column('prompt_version', sa.String(), nullable=False),
+        sa.Column('response', sa.JSON(), nullable=False),
+        sa.Column('hit_count', sa.BigInteger(), server_default='0', nullable=False),
+        sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('last_hit_at', sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.Column('expires_at', sa.TIMESTAMP(timezone=True), nullable=False),
+    )
+    op.create_index('ix_llm_response_cache_expires_at', 'llm_response_cache', ['expires_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_llm_response_cache_expires_at', table_name='llm_response_cache')
+    op.drop_table('llm_response_cache')
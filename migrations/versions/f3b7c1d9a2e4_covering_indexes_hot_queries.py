@@ -0,0 +1,61 @@
+"""covering indexes for hot queries; reconcile eod_prices uniqueness
+
+Revision ID: f3b7c1d9a2e4
+Revises: a6c2f9d1e7b3
+Create Date: 2025-09-22
+
+The two "make_trade_date_unique" revisions (e2d61924fd73, 92e044143cbf) were
+empty. Uniqueness on trade_date alone would be wrong once more than one symbol
+is stored; the intended key is (symbol, trade_date), which the model declares
+and ON CONFLICT relies on. This revision drops any trade_date-only uniqueness
+that may have been added by hand and rebuilds uq_eod_prices_symbol_date with
+INCLUDE columns, so one index serves uniqueness, upserts and index-only
+backward scans for "symbol = ? ORDER BY trade_date DESC LIMIT n".
+
+ix_daily_rec_symbol_latest has no INCLUDE columns: the latest-recommendation
+lookups return the whole row (rationale and content included), so they visit
+the heap anyway and the key alone serves the LIMIT 1 probe.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3b7c1d9a2e4'
+down_revision = 'a6c2f9d1e7b3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Stray trade_date-only uniqueness (names Postgres / earlier attempts would have used)
+    op.execute("ALTER TABLE eod_prices DROP CONSTRAINT IF EXISTS eod_prices_trade_date_key")
+    op.execute("ALTER TABLE eod_prices DROP CONSTRAINT IF EXISTS uq_eod_prices_trade_date")
+    op.execute("DROP INDEX IF EXISTS uq_eod_prices_trade_date")
+
+    # Same name and key, now covering OHLCV. Runs in the migration transaction,
+    # so writers never observe the table without the constraint.
+    op.execute("ALTER TABLE eod_prices DROP CONSTRAINT IF EXISTS uq_eod_prices_symbol_date")
+    op.execute(
+        "ALTER TABLE eod_prices ADD CONSTRAINT uq_eod_prices_symbol_date "
+        "UNIQUE (symbol, trade_date) INCLUDE (open, high, low, close, volume)"
+    )
+
+    op.create_index(
+        'ix_daily_rec_symbol_latest',
+        'daily_recommendations',
+        ['symbol', sa.text('trade_date DESC'), sa.text('created_at DESC')],
+    )
+
+    # Fresh statistics and visibility map so the planner picks the new indexes
+    op.execute("ANALYZE eod_prices")
+    op.execute("ANALYZE daily_recommendations")
+
+
+def downgrade() -> None:
+    op.drop_index('ix_daily_rec_symbol_latest', table_name='daily_recommendations')
+    op.execute("ALTER TABLE eod_prices DROP CONSTRAINT IF EXISTS uq_eod_prices_symbol_date")
+    op.create_unique_constraint(
+        'uq_eod_prices_symbol_date', 'eod_prices', ['symbol', 'trade_date']
+    )
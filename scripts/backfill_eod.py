@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""Backfill job: fetch an EOD date window from FMP in one request and bulk-upsert it."""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from datetime import date, timedelta
+
+from dotenv import load_dotenv
+
+# Ensure env is loaded (DATABASE_URL, FMP_API_KEY)
+load_dotenv()
+
+from app.services.fmp_service import iter_eod_range
+from app.services.repository import record_coverage, upsert_eod_many
+
+
+def main(argv=None) -> int:
+    today = date.today()
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("symbols", nargs="*", help="Symbols to backfill (default: SYMBOL env or BTCUSD)")
+    parser.add_argument("--from", dest="from_date", type=date.fromisoformat, default=today - timedelta(days=365))
+    parser.add_argument("--to", dest="to_date", type=date.fromisoformat, default=today)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    symbols = args.symbols or [os.getenv("SYMBOL", "BTCUSD")]
+    rc = 0
+    for symbol in symbols:
+        try:
+            rows = iter_eod_range(symbol, args.from_date, args.to_date)
+            inserted, updated = upsert_eod_many(symbol, rows, batch_size=args.batch_size)
+            # Let the read-through price store skip this window (today's bar may still change)
+            record_coverage(symbol, args.from_date, min(args.to_date, today - timedelta(days=1)))
+            print(
+                f"[{symbol}] {args.from_date.isoformat()}..{args.to_date.isoformat()}: "
+                f"{inserted} inserted, {updated} updated"
+            )
+        except Exception as e:
+            print(f"[{symbol}] ERROR: backfill failed: {e}")
+            rc = 1
+    return rc
+
+
+if __name__ == "__main__":
+    sys.exit(main())
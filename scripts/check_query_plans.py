@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""EXPLAIN-based regression check: hot queries must stay index-backed.
+
+Runs EXPLAIN (FORMAT JSON) for each hot query with sequential scans disabled
+for the transaction (so tiny dev tables still show which index *can* serve the
+query) and fails if the plan does not use the expected index and scan type.
+Prints a JSON report; exit code 1 on any regression. On the partitioned
+eod_prices table the scans hit each partition's copy of the index, so any
+index scan on an eod_prices_y* partition counts for the parent's index.
+"""
+from __future__ import annotations
+
+import json
+import os
+import sys
+from typing import Any, Dict, Iterator, List
+
+from dotenv import load_dotenv
+
+# Ensure env is loaded (DATABASE_URL)
+load_dotenv()
+
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+
+from app.db import engine
+from app.services.repository import (
+    last_n_days_query,
+    latest_recommendation_query,
+    latest_recommendations_query,
+    screener_query,
+)
+
+
+SYMBOL = os.getenv("SYMBOL", "BTCUSD")
+
+# name -> (statement, expected index, acceptable node types). The recommendation
+# lookups return whole rows, so a plain Index Scan is the expected plan there.
+CHECKS = {
+    "get_last_n_days": (
+        last_n_days_query(SYMBOL, 30),
+        "uq_eod_prices_symbol_date",
+        {"Index Only Scan"},
+    ),
+    "latest_recommendation": (
+        latest_recommendation_query(SYMBOL),
+        "ix_daily_rec_symbol_latest",
+        {"Index Scan"},
+    ),
+    "latest_recommendations_batch": (
+        latest_recommendations_query([SYMBOL, "ETHUSD"]),
+        "ix_daily_rec_symbol_latest",
+        {"Index Scan"},
+    ),
+    # Latest rolling stats per symbol: a backward LIMIT 1 probe of the primary key
+    "screener_latest_stats": (
+        screener_query(symbols=[SYMBOL, "ETHUSD"]),
+        "eod_rolling_stats_pkey",
+        {"Index Scan"},
+    ),
+}
+
+# Parent index -> relation prefix of partitions carrying an attached copy of it
+PARTITION_INDEXES = {"uq_eod_prices_symbol_date": "eod_prices_y"}
+
+
+def _uses(scan: Dict[str, Any], index: str) -> bool:
+    if scan["index"] == index:
+        return True
+    prefix = PARTITION_INDEXES.get(index)
+    return bool(prefix and scan["index"] and (scan["relation"] or "").startswith(prefix))
+
+
+def _nodes(plan: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _nodes(child)
+
+
+def main() -> int:
+    report: List[Dict[str, Any]] = []
+    failed = False
+    with engine.connect() as conn:
+        conn.execute(text("SET LOCAL enable_seqscan = off"))
+        for name, (stmt, index, node_types) in CHECKS.items():
+            sql = str(stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+            plan = conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar_one()[0]["Plan"]
+            scans = [
+                {
+                    "node": n["Node Type"],
+                    "relation": n.get("Relation Name"),
+                    "index": n.get("Index Name"),
+                    "direction": n.get("Scan Direction"),
+                }
+                for n in _nodes(plan)
+                if "Scan" in n["Node Type"]
+            ]
+            ok = any(_uses(s, index) and s["node"] in node_types for s in scans)
+            failed |= not ok
+            report.append({
+                "query": name,
+                "ok": ok,
+                "expected": {"index": index, "node": sorted(node_types)},
+                "scans": scans,
+                "total_cost": plan.get("Total Cost"),
+            })
+        conn.rollback()
+
+    print(json.dumps(report, indent=2))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,15 @@
+from datetime import date
+
 from app.db import engine
 from app.models import Base
+from app.services.repository import ensure_eod_partitions
 
 
 def main() -> None:
     # Create all tables defined in models.Base metadata
     Base.metadata.create_all(bind=engine)
+    # eod_prices is partitioned; rows need a partition for their year
+    ensure_eod_partitions([date.today().year, date.today().year + 1])
     print("Tables created (if not existing).")
 
 
@@ -1,11 +1,20 @@
 #!/usr/bin/env python3
-"""Daily job: fetch today's EOD, persist, analyze last 7 days, store recommendation."""
+"""Daily job: fetch today's EOD, persist, analyze the recent window, store recommendation.
+
+Runs for a single SYMBOL by default. Pass several symbols on the command line
+(or a comma-separated SYMBOLS env var) to run a watchlist concurrently, with
+separate concurrency limits for FMP fetches and Gemini calls, and optionally
+several symbols per Gemini request (--llm-batch-size).
+"""
 from __future__ import annotations
 
+import argparse
 import os
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date
-from typing import cast
+from typing import Any, Callable, Dict, List, Optional, Tuple, cast
 
 from dotenv import load_dotenv
 
@@ -18,82 +27,329 @@ from app.services.repository import (
     get_last_n_days,
     save_daily_recommendation,
 )
-from app.services.llm_service import analyze_with_gemini
+from app.services import llm_cache, profiling
+from app.services.indicators import compute_features
+from app.services.rolling_stats import get_rolling_stats
+from app.services.llm_service import (
+    DEFAULT_BATCH_SIZE,
+    analyze_features_batch_with_gemini,
+    batch_size_from_env,
+    analyze_features_with_gemini,
+)
 
 
-def main():
-    symbol = os.getenv("SYMBOL", "BTCUSD")
-    # Prefer explicit GEMINI_MODEL, fall back to MODEL_NAME, default to gemini-1.5-flash
-    model_name = os.getenv("GEMINI_MODEL", os.getenv("MODEL_NAME", "gemini-2.5-flash"))
+# Exit codes per symbol (also the process exit code in single-symbol mode)
+EXIT_OK = 0
+EXIT_WATCHLIST_FAILED = 1
+EXIT_FETCH_FAILED = 2
+EXIT_UPSERT_FAILED = 3
+EXIT_NO_DATA = 4
+EXIT_SAVE_FAILED = 5
+EXIT_LLM_FAILED = 6
 
-    today = date.today()
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.getenv(name, str(default))))
+    except ValueError:
+        return default
+
+
+# Analysis window and indicator windows (days)
+WINDOW_DAYS = _env_int("ANALYSIS_WINDOW_DAYS", 7)
+SMA_WINDOW = _env_int("SMA_WINDOW", 5)
+EMA_WINDOW = _env_int("EMA_WINDOW", 5)
+RSI_WINDOW = _env_int("RSI_WINDOW", 14)
+ATR_WINDOW = _env_int("ATR_WINDOW", 14)
+# Extra history so RSI/ATR (which need window + 1 rows) can warm up
+INDICATOR_LOOKBACK = max(SMA_WINDOW, EMA_WINDOW, RSI_WINDOW, ATR_WINDOW) + 1
+
+
+class StageLimits:
+    """Bounded concurrency per pipeline stage, shared by all symbol workers."""
+
+    def __init__(self, fmp: int = 1, llm: int = 1) -> None:
+        self.fmp = threading.BoundedSemaphore(fmp)
+        self.llm = threading.BoundedSemaphore(llm)
+
+
+def _logger(symbol: str) -> Callable[[str], None]:
+    def log(msg: str) -> None:
+        print(f"[{symbol}] {msg}", flush=True)
+
+    return log
+
+
+def prepare_symbol(
+    symbol: str, today: date, limits: StageLimits
+) -> Tuple[int, Optional[Dict[str, Any]], Optional[date]]:
+    """Fetch → upsert → load → features for one symbol.
+
+    Returns (exit code, features, latest trade date); features is None unless
+    the code is EXIT_OK.
+    """
+    log = _logger(symbol)
 
     # 1) Fetch today's EOD from FMP and persist if new
     try:
-        payload = fetch_eod_for_date(symbol, today)
-        print(f"Fetched EOD for {symbol} on {today.isoformat()}: {payload}")
+        with limits.fmp, profiling.stage(f"{symbol}-fetch"):
+            payload = fetch_eod_for_date(symbol, today)
+        log(f"Fetched EOD on {today.isoformat()}: {payload}")
     except Exception as e:
-        print(f"ERROR: fetching EOD failed: {e}")
-        return 2
+        log(f"ERROR: fetching EOD failed: {e}")
+        return EXIT_FETCH_FAILED, None, None
 
     try:
-        inserted = upsert_eod_from_payload(symbol, payload)
+        with profiling.stage(f"{symbol}-upsert"):
+            inserted = upsert_eod_from_payload(symbol, payload)
         action = "inserted" if inserted else "exists"
-        print(f"EOD for {today.isoformat()} {action}")
+        log(f"EOD for {today.isoformat()} {action}")
     except Exception as e:
-        print(f"ERROR: upserting EOD failed: {e}")
-        return 3
+        log(f"ERROR: upserting EOD failed: {e}")
+        return EXIT_UPSERT_FAILED, None, None
 
-    # 2) Load last 7 days (including today if present)
-    prices = get_last_n_days(symbol, 7)
+    # 2) Load the analysis window plus indicator warm-up (including today if present)
+    with profiling.stage(f"{symbol}-load"):
+        prices = get_last_n_days(symbol, WINDOW_DAYS + INDICATOR_LOOKBACK)
     if not prices:
-        print("WARN: No price data available for analysis")
-        return 4
-
-    # Build array of objects for LLM (oldest -> newest)
-    def to_float(x):
-        return float(x) if x is not None else None
-
-    data = [
-        {
-            "change": to_float(p.change_abs),
-            "changePercent": to_float(p.change_percent),
-            "close": to_float(p.close),
-            "date": p.trade_date.isoformat(),
-            "high": to_float(p.high),
-            "low": to_float(p.low),
-            "open": to_float(p.open),
-            "symbol": p.symbol,
-            "volume": p.volume,
-            "vwap": to_float(p.vwap),
-        }
-        for p in reversed(prices)
-    ]
-    print("Recent data retrieved from DB")
+        log("WARN: No price data available for analysis")
+        return EXIT_NO_DATA, None, None
 
-    # 3) Analyze with Gemini and save recommendation
+    # Pre-compute the feature vector (oldest -> newest) so the LLM only writes the verdict
+    with profiling.stage(f"{symbol}-features"):
+        features = compute_features(
+            reversed(prices),
+            window_days=WINDOW_DAYS,
+            sma_window=SMA_WINDOW,
+            ema_window=EMA_WINDOW,
+            rsi_window=RSI_WINDOW,
+            atr_window=ATR_WINDOW,
+        )
+    # Longer-horizon context precomputed on ingest (7/30/90-bar returns, volatility, ranges)
+    trade_date = cast(date, prices[0].trade_date)  # latest date is first due to desc ordering
     try:
-        analysis = analyze_with_gemini(data, model=model_name)
+        rolling = get_rolling_stats(symbol, trade_date)
     except Exception as e:
-        print(f"ERROR: LLM analysis failed: {e}")
-        return 6
+        log(f"WARN: loading rolling stats failed: {e}")
+        rolling = None
+    if rolling:
+        features["rolling"] = {k: v for k, v in rolling.items() if k not in ("symbol", "date")}
+    log(f"Features computed from DB: {features}")
+    return EXIT_OK, features, trade_date
 
-    print(f"LLM analysis result: {analysis}")
 
-    trade_date = cast(
-        date, prices[0].trade_date
-    )  # latest date is first due to desc ordering
+def save_symbol(symbol: str, trade_date: date, model_name: str, analysis: Dict[str, Any]) -> int:
+    """Persist one symbol's recommendation and return its exit code."""
+    log = _logger(symbol)
+    log(f"LLM analysis result: {analysis}")
     try:
-        saved = save_daily_recommendation(symbol, trade_date, model_name, analysis)
+        with profiling.stage(f"{symbol}-save"):
+            saved = save_daily_recommendation(symbol, trade_date, model_name, analysis)
         msg = "saved" if saved else "duplicate (skipped)"
-        print(
-            f"Recommendation for {symbol} {trade_date.isoformat()} {msg}: {analysis['recommendation']}"
+        log(
+            f"Recommendation for {trade_date.isoformat()} {msg}: {analysis['recommendation']}"
         )
     except Exception as e:
-        print(f"ERROR: saving recommendation failed: {e}")
-        return 5
+        log(f"ERROR: saving recommendation failed: {e}")
+        return EXIT_SAVE_FAILED
+
+    return EXIT_OK
+
+
+def run_symbol(
+    symbol: str, model_name: str, today: date, limits: Optional[StageLimits] = None
+) -> int:
+    """Run fetch → upsert → load → features → LLM → save for one symbol and return its exit code."""
+    limits = limits or StageLimits()
+    code, features, trade_date = prepare_symbol(symbol, today, limits)
+    if code != EXIT_OK:
+        return code
+
+    # 3) Analyze with Gemini and save recommendation
+    try:
+        with limits.llm, profiling.stage(f"{symbol}-llm"):
+            analysis = analyze_features_with_gemini(features, model=model_name)
+    except Exception as e:
+        _logger(symbol)(f"ERROR: LLM analysis failed: {e}")
+        return EXIT_LLM_FAILED
+
+    return save_symbol(symbol, cast(date, trade_date), model_name, analysis)
+
+
+def run_watchlist(
+    symbols: List[str],
+    model_name: str,
+    today: date,
+    fmp_concurrency: int,
+    llm_concurrency: int,
+    workers: int,
+    llm_batch_size: int = 0,
+) -> Dict[str, int]:
+    """Run every symbol through the pipeline concurrently; never stops at the first failure.
+
+    Each symbol is a worker task; FMP fetches and Gemini calls are gated by
+    their own semaphores so upstream quotas are respected regardless of the
+    number of workers. With llm_batch_size > 1 the LLM stage runs after all
+    features are ready, llm_batch_size symbols per Gemini request (see
+    run_watchlist_batched). Returns a mapping of symbol -> exit code.
+    """
+    limits = StageLimits(fmp=fmp_concurrency, llm=llm_concurrency)
+    if llm_batch_size > 1:
+        return run_watchlist_batched(symbols, model_name, today, limits, workers, llm_batch_size, llm_concurrency)
+    results: Dict[str, int] = {}
+
+    def task(symbol: str) -> int:
+        try:
+            return run_symbol(symbol, model_name, today, limits)
+        except Exception as e:  # defensive: one symbol must not abort the batch
+            print(f"[{symbol}] ERROR: unexpected failure: {e}", flush=True)
+            return EXIT_WATCHLIST_FAILED
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="eod") as pool:
+        futures = {symbol: pool.submit(task, symbol) for symbol in symbols}
+        for symbol, fut in futures.items():
+            results[symbol] = fut.result()
+    return results
+
+
+def run_watchlist_batched(
+    symbols: List[str],
+    model_name: str,
+    today: date,
+    limits: StageLimits,
+    workers: int,
+    batch_size: int,
+    llm_concurrency: int,
+) -> Dict[str, int]:
+    """Three phases: features for every symbol (threaded), batched LLM verdicts, saves.
+
+    Packing many symbols per Gemini request pays the system prompt and round
+    trip once per batch instead of once per symbol; elements that come back
+    missing or invalid are retried one by one by the LLM service.
+    """
+    results: Dict[str, int] = {}
+    prepared: Dict[str, Tuple[Dict[str, Any], date]] = {}
+
+    def prepare(symbol: str) -> Tuple[int, Optional[Dict[str, Any]], Optional[date]]:
+        try:
+            return prepare_symbol(symbol, today, limits)
+        except Exception as e:  # defensive: one symbol must not abort the batch
+            print(f"[{symbol}] ERROR: unexpected failure: {e}", flush=True)
+            return EXIT_WATCHLIST_FAILED, None, None
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="eod") as pool:
+        for symbol, (code, features, trade_date) in zip(symbols, pool.map(prepare, symbols)):
+            if code == EXIT_OK and features is not None and trade_date is not None:
+                prepared[symbol] = (features, trade_date)
+            else:
+                results[symbol] = code
+
+    names = list(prepared)
+    with profiling.stage("watchlist-llm-batched"):
+        analyses = analyze_features_batch_with_gemini(
+            [prepared[s][0] for s in names],
+            model=model_name,
+            batch_size=batch_size,
+            max_workers=llm_concurrency,
+        )
+    print(f"LLM: {len(names)} symbols in batches of {batch_size}", flush=True)
+
+    for symbol, analysis in zip(names, analyses):
+        if isinstance(analysis, Exception):
+            _logger(symbol)(f"ERROR: LLM analysis failed: {analysis}")
+            results[symbol] = EXIT_LLM_FAILED
+        else:
+            results[symbol] = save_symbol(symbol, prepared[symbol][1], model_name, analysis)
+
+    return {symbol: results[symbol] for symbol in symbols}
+
+
+def _parse_symbols(argv_symbols: List[str]) -> List[str]:
+    raw = argv_symbols or (os.getenv("SYMBOLS") or os.getenv("SYMBOL", "BTCUSD")).split(",")
+    symbols: List[str] = []
+    for s in raw:
+        s = s.strip().upper()
+        if s and s not in symbols:
+            symbols.append(s)
+    return symbols
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "symbols",
+        nargs="*",
+        help="Symbols to process (default: SYMBOLS or SYMBOL env, then BTCUSD)",
+    )
+    parser.add_argument(
+        "--fmp-concurrency",
+        type=int,
+        default=_env_int("FMP_CONCURRENCY", 4),
+        help="Max concurrent FMP requests (env FMP_CONCURRENCY, default 4)",
+    )
+    parser.add_argument(
+        "--llm-concurrency",
+        type=int,
+        default=_env_int("LLM_CONCURRENCY", 2),
+        help="Max concurrent Gemini calls (env LLM_CONCURRENCY, default 2)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=_env_int("PIPELINE_WORKERS", 8),
+        help="Symbol worker threads (env PIPELINE_WORKERS, default 8)",
+    )
+    parser.add_argument(
+        "--llm-batch-size",
+        type=int,
+        default=batch_size_from_env(),
+        help="Symbols per Gemini request in watchlist mode; 1 = one request per symbol "
+        f"(env LLM_BATCH_SIZE, default {DEFAULT_BATCH_SIZE})",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Profile each stage into PROFILE_DIR (same as PROFILE_JOB=1; PROFILE_MODE=sample|cprofile)",
+    )
+    args = parser.parse_args(argv)
+    if args.profile:
+        os.environ["PROFILE_JOB"] = "1"
+
+    symbols = _parse_symbols(args.symbols)
+    # Prefer explicit GEMINI_MODEL, fall back to MODEL_NAME, default to gemini-2.5-flash
+    model_name = os.getenv("GEMINI_MODEL", os.getenv("MODEL_NAME", "gemini-2.5-flash"))
+
+    today = date.today()
+
+    # Trim the persistent LLM response cache once per run (expired + over size)
+    if llm_cache.enabled():
+        try:
+            evicted = llm_cache.evict()
+            if evicted:
+                print(f"LLM cache: evicted {evicted} entries")
+        except Exception as e:
+            print(f"WARN: LLM cache eviction failed: {e}")
+
+    if len(symbols) == 1:
+        return run_symbol(symbols[0], model_name, today)
+
+    results = run_watchlist(
+        symbols,
+        model_name,
+        today,
+        fmp_concurrency=max(1, args.fmp_concurrency),
+        llm_concurrency=max(1, args.llm_concurrency),
+        workers=max(1, min(args.workers, len(symbols))),
+        llm_batch_size=args.llm_batch_size,
+    )
+
+    failed = {s: code for s, code in results.items() if code != EXIT_OK}
+    print(f"Summary: {len(results) - len(failed)}/{len(results)} symbols succeeded")
+    for symbol, code in results.items():
+        status = "ok" if code == EXIT_OK else f"failed (exit {code})"
+        print(f"  {symbol}: {status}")
 
-    return 0
+    return EXIT_WATCHLIST_FAILED if failed else EXIT_OK
 
 
 if __name__ == "__main__":
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""Export eod_prices to an Arrow IPC stream or Parquet file, one typed column per field."""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from datetime import date
+
+from dotenv import load_dotenv
+
+# Ensure env is loaded (DATABASE_URL)
+load_dotenv()
+
+from app.services.columnar_export import FORMATS, write_prices
+from app.services.repository import PRICE_COLUMNS
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("output", help="Output path (e.g. prices.parquet or prices.arrows)")
+    parser.add_argument("--format", choices=FORMATS, default=None, help="Default: from the output extension")
+    parser.add_argument("--symbols", default="", help="Comma-separated symbols (default: all)")
+    parser.add_argument("--from", dest="from_date", type=date.fromisoformat, default=None)
+    parser.add_argument("--to", dest="to_date", type=date.fromisoformat, default=None)
+    parser.add_argument("--columns", default=",".join(PRICE_COLUMNS))
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ("parquet" if args.output.endswith(".parquet") else "arrow")
+    symbols = [s.strip() for s in args.symbols.split(",") if s.strip()] or None
+    columns = [c.strip() for c in args.columns.split(",") if c.strip()]
+    unknown = [c for c in columns if c not in PRICE_COLUMNS]
+    if unknown:
+        print(f"ERROR: unknown columns {unknown}; choose from {list(PRICE_COLUMNS)}")
+        return 2
+
+    start = time.perf_counter()
+    try:
+        with open(args.output, "wb") as sink:
+            rows = write_prices(sink, fmt, symbols, args.from_date, args.to_date, columns)
+    except Exception as e:
+        print(f"ERROR: export failed: {e}")
+        return 1
+    print(f"Wrote {rows} rows to {args.output} ({fmt}) in {time.perf_counter() - start:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
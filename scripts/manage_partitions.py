@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""Manage yearly eod_prices partitions: pre-create upcoming years, list, or detach old ones."""
+from __future__ import annotations
+
+import argparse
+import sys
+from datetime import date
+
+from dotenv import load_dotenv
+
+# Ensure env is loaded (DATABASE_URL)
+load_dotenv()
+
+from app.services.repository import (
+    detach_eod_partition,
+    ensure_eod_partitions,
+    list_eod_partitions,
+)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    sub = parser.add_subparsers(dest="command", required=True)
+    ensure = sub.add_parser("ensure", help="Create partitions for this year and the next N years")
+    ensure.add_argument("--years-ahead", type=int, default=1)
+    sub.add_parser("list", help="List attached partitions")
+    detach = sub.add_parser("detach", help="Detach a year's partition (the table is kept)")
+    detach.add_argument("year", type=int)
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "ensure":
+            this_year = date.today().year
+            ensure_eod_partitions(range(this_year, this_year + max(0, args.years_ahead) + 1))
+            for name in list_eod_partitions():
+                print(name)
+        elif args.command == "list":
+            for name in list_eod_partitions():
+                print(name)
+        else:
+            print(f"Detached {detach_eod_partition(args.year)}")
+    except Exception as e:
+        print(f"ERROR: {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""Rebuild eod_rolling_stats from eod_prices (full history) for some or all symbols."""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+
+from dotenv import load_dotenv
+
+# Ensure env is loaded (DATABASE_URL)
+load_dotenv()
+
+from app.services.rolling_stats import rebuild
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("symbols", nargs="*", help="Symbols to rebuild (default: all)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    try:
+        written = rebuild([s.strip().upper() for s in args.symbols] or None)
+    except Exception as e:
+        print(f"ERROR: rebuilding rolling stats failed: {e}")
+        return 1
+    print(f"Rolling stats: {written} rows in {time.perf_counter() - start:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())